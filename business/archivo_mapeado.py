@@ -0,0 +1,118 @@
+"""Archivos precalculados de la IA (libro de aperturas, tablebase), mapeados en memoria.
+
+Cada archivo empieza con una cabecera cuyos primeros campos son la magia, la version, las
+filas, las columnas y las fichas seguidas de la configuracion para la que se construyo. Se
+busca uno por configuracion de tablero, con un patron de settings.py como ruta.
+"""
+
+import mmap
+import os
+import struct
+from abc import ABC, abstractmethod
+
+def ruta_configuracion(patron: str, filas: int, columnas: int, fichas_seguidas: int) -> str:
+    """Ruta del archivo de una configuracion de tablero, con un patron como settings.IA_LIBRO_APERTURAS."""
+    return patron.format(filas=filas, columnas=columnas, fichas_seguidas=fichas_seguidas)
+
+def preparar_directorio(ruta: str):
+    """Crea el directorio de 'ruta' si no existe, antes de escribir el archivo."""
+    directorio = os.path.dirname(ruta)
+    if directorio:
+        os.makedirs(directorio, exist_ok=True)
+
+class ArchivoMapeado(ABC):
+    """Archivo binario con cabecera, mapeado en memoria recien en la primera consulta.
+
+    Las subclases definen MAGIA, VERSION, CABECERA (un struct.Struct), NOMBRE (para los
+    mensajes de error) y el largo que debe tener el archivo segun su cabecera.
+    """
+    MAGIA: bytes
+    VERSION: int
+    CABECERA: struct.Struct
+    NOMBRE: str
+
+    def __init__(self, ruta: str):
+        self.__ruta = ruta
+        self.__archivo = None
+        self.__datos = None
+        self.__cabecera = None
+
+    def ruta(self):
+        return self.__ruta
+
+    def datos(self) -> mmap.mmap:
+        """El archivo mapeado, cargandolo si hace falta."""
+        if self.__datos is None:
+            self.__cargar()
+        return self.__datos
+
+    def cabecera(self) -> tuple:
+        """Campos de la cabecera, en el orden de CABECERA."""
+        if self.__datos is None:
+            self.__cargar()
+        return self.__cabecera
+
+    def dimensiones(self) -> tuple[int, int, int]:
+        """Filas, columnas y fichas seguidas para las que se construyo el archivo."""
+        return self.cabecera()[2:5]
+
+    @abstractmethod
+    def largo_esperado(self, cabecera: tuple) -> int:
+        """Largo en bytes que debe tener el archivo con esa cabecera."""
+
+    def __cargar(self):
+        archivo = open(self.__ruta, 'rb')
+        try:
+            datos = mmap.mmap(archivo.fileno(), 0, access=mmap.ACCESS_READ)
+        except ValueError:
+            archivo.close()
+            raise ValueError(f'No se pudo leer {self.NOMBRE}, el archivo esta vacio ({self.__ruta})')
+
+        if len(datos) < self.CABECERA.size:
+            datos.close()
+            archivo.close()
+            raise ValueError(f'No se pudo leer {self.NOMBRE}, el archivo esta incompleto ({self.__ruta})')
+
+        cabecera = self.CABECERA.unpack_from(datos, 0)
+        if cabecera[0] != self.MAGIA or cabecera[1] != self.VERSION or len(datos) != self.largo_esperado(cabecera):
+            datos.close()
+            archivo.close()
+            raise ValueError(f'No se pudo leer {self.NOMBRE}, el archivo no tiene el formato esperado ({self.__ruta})')
+
+        self.__archivo = archivo
+        self.__datos = datos
+        self.__cabecera = cabecera
+
+    def cerrar(self):
+        """Libera el archivo mapeado, se vuelve a abrir si se consulta de nuevo."""
+        if self.__datos is not None:
+            self.__datos.close()
+            self.__archivo.close()
+            self.__datos = None
+            self.__archivo = None
+
+class ArchivosPorConfiguracion():
+    """Archivos abiertos por configuracion de tablero, None si no fue construido."""
+
+    def __init__(self, patron: str, clase: type):
+        self.__patron = patron
+        self.__clase = clase
+        self.__archivos = {}
+
+    def ruta(self, filas: int, columnas: int, fichas_seguidas: int) -> str:
+        return ruta_configuracion(self.__patron, filas, columnas, fichas_seguidas)
+
+    def obtener(self, filas: int, columnas: int, fichas_seguidas: int):
+        """Devuelve el archivo de una configuracion, o None si no existe.
+
+        Solo se revisa si el archivo existe; los datos se cargan en la primera consulta.
+        """
+        clave = (filas, columnas, fichas_seguidas)
+        if clave not in self.__archivos:
+            ruta = self.ruta(filas, columnas, fichas_seguidas)
+            self.__archivos[clave] = self.__clase(ruta) if os.path.isfile(ruta) else None
+        return self.__archivos[clave]
+
+    def olvidar(self, filas: int, columnas: int, fichas_seguidas: int):
+        """Se llama al reescribir el archivo, para volver a buscarlo en la proxima consulta."""
+        self.__archivos.pop((filas, columnas, fichas_seguidas), None)
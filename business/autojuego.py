@@ -0,0 +1,240 @@
+"""Partidas entre participantes sin interfaz, para medir la fuerza y la velocidad de las IA.
+
+Las partidas se reparten en un pool de procesos y cada resultado se escribe como una linea
+JSON apenas termina:
+
+    python -m business.autojuego --partidas 1000 --jugador-1 Minimax_AI --jugador-2 Aleatorio_AI
+
+Los participantes se indican por el nombre de su clase en business.jugador, o como
+'modulo:Clase' para otras implementaciones de ParticipanteTateti.
+"""
+
+import argparse
+import concurrent.futures
+import importlib
+import json
+import os
+import random
+import time
+import business.tablero_tateti as tablero_tateti
+import business.estado as estado
+import business.jugador as jugador
+from settings import (
+    TABLERO_FILAS,
+    TABLERO_COLUMNAS,
+    FICHAS_SEGUIDAS_GANAR,
+    FICHAS_DEFAULT
+)
+
+# Partidas que se mandan juntas a cada proceso
+PARTIDAS_POR_TAREA = 8
+
+class PartidaHeadless():
+    """Partida con la misma interfaz que Tateti ve un participante, pero sin entrada ni pantalla."""
+
+    def __init__(self, jugadores: list["jugador.ParticipanteTateti"], filas: int, columnas: int, fichas_seguidas: int):
+        self.__jugadores = jugadores
+        self.__fichas = [participante.ficha() for participante in jugadores]
+        self.__fichas_seguidas = fichas_seguidas
+        self.__estado = estado.EstadoTateti(filas, columnas, fichas_seguidas, self.__fichas)
+
+    # Getters
+    def tablero(self):
+        return self.__estado.tablero()
+
+    def estado(self):
+        return self.__estado
+
+    def jugadores(self):
+        return self.__jugadores
+
+    def indice_turno(self):
+        return self.__estado.indice_turno()
+
+    def cant_jugadores(self):
+        return len(self.__jugadores)
+
+    def fichas(self):
+        return self.__fichas
+
+    def fichas_seguidas(self):
+        return self.__fichas_seguidas
+
+    def jugador_actual(self):
+        return self.__jugadores[self.__estado.indice_turno()]
+
+    def aplicar_movimiento(self, x: int, y: int):
+        """Juega un movimiento del jugador del turno sin consultarlo, para llegar a una posicion dada."""
+        self.__estado = self.__estado.apply_move(x, y)
+
+    def jugar(self) -> dict:
+        """Juega la partida hasta el final.
+
+        Un movimiento invalido termina la partida con resultado 'error' en lugar de volver a
+        pedirlo, para que una IA determinista no quede en un ciclo.
+
+        Returns:
+            dict: Movimientos, latencia de cada uno en segundos, ganador y resultado.
+        """
+        movimientos = []
+        latencias = []
+        error = None
+
+        while self.__estado.status() == estado.JUGANDO:
+            participante = self.jugador_actual()
+
+            inicio = time.perf_counter()
+            x, y = participante.colocar_ficha(self)
+            latencias.append(time.perf_counter() - inicio)
+
+            try:
+                x, y = int(x), int(y)
+                self.__estado = self.__estado.apply_move(x, y)
+            except (TypeError, ValueError, tablero_tateti.OcupadoError) as e:
+                error = f'{participante.nombre()}: {e}'
+                break
+            movimientos.append((x, y))
+
+        ganador = self.__estado.ganador()
+        return {
+            "movimientos": movimientos,
+            "latencias": latencias,
+            "ganador": None if ganador is None else ganador.simbolo(),
+            "resultado": "error" if error is not None else self.__estado.status(),
+            "error": error
+        }
+
+def clase_participante(nombre: str) -> type:
+    """Busca la clase de un participante por nombre ('Minimax_AI' o 'modulo:Clase')."""
+    modulo, _, clase = nombre.rpartition(":")
+    encontrada = getattr(importlib.import_module(modulo) if modulo else jugador, clase, None)
+
+    if not isinstance(encontrada, type) or not issubclass(encontrada, jugador.ParticipanteTateti):
+        raise ValueError(f'{nombre} no es un participante de Ta-Te-Ti')
+    return encontrada
+
+def jugar_partida(numero: int, participantes: tuple[str, str], filas: int, columnas: int,
+                  fichas_seguidas: int, semilla: int, alternar: bool = True) -> dict:
+    """Juega una partida entre participantes nuevos.
+
+    Args:
+        numero (int): Numero de la partida, se usa para la semilla y para alternar quien empieza.
+        participantes (tuple[str, str]): Nombres de las clases de los participantes.
+        filas (int): Filas del tablero.
+        columnas (int): Columnas del tablero.
+        fichas_seguidas (int): Fichas en linea necesarias para ganar.
+        semilla (int): Semilla base, la partida usa semilla + numero.
+        alternar (bool): Si en las partidas impares empieza el segundo participante.
+
+    Returns:
+        dict: El resultado de PartidaHeadless.jugar, con los datos de la partida.
+    """
+    random.seed(semilla + numero)
+
+    jugadores = []
+    for indice, nombre in enumerate(participantes):
+        participante = clase_participante(nombre)()
+        participante.set_ficha(jugador.Ficha(FICHAS_DEFAULT[indice]))
+        # Los procesos del pool no pueden crear su propio pool, y pensar en el turno del otro
+        # solo le quitaria tiempo al rival
+        if isinstance(participante, jugador.Minimax_AI):
+            participante.procesos = 1
+            participante.tiempo_ponderacion = None
+        jugadores.append(participante)
+
+    if alternar and numero % 2:
+        jugadores.reverse()
+
+    inicio = time.perf_counter()
+    datos = PartidaHeadless(jugadores, filas, columnas, fichas_seguidas).jugar()
+
+    registro = {
+        "partida": numero,
+        "semilla": semilla + numero,
+        "jugadores": [type(participante).__name__ for participante in jugadores],
+        "fichas": [participante.ficha().simbolo() for participante in jugadores]
+    }
+    registro.update(datos)
+    registro["duracion"] = time.perf_counter() - inicio
+    return registro
+
+def _jugar_tarea(numeros: range, participantes, filas, columnas, fichas_seguidas, semilla, alternar) -> list[dict]:
+    return [jugar_partida(numero, participantes, filas, columnas, fichas_seguidas, semilla, alternar) for numero in numeros]
+
+def jugar_partidas(cantidad: int, participantes: tuple[str, str], filas: int, columnas: int, fichas_seguidas: int,
+                   salida: str, procesos: int = 0, semilla: int = 0, alternar: bool = True) -> dict:
+    """Juega 'cantidad' partidas en un pool de procesos y las escribe en 'salida' (JSONL).
+
+    Args:
+        procesos (int): Procesos del pool, 0 usa todos los nucleos y 1 juega en este proceso.
+
+    Returns:
+        dict: Resumen con victorias por participante, empates, errores y partidas por segundo.
+    """
+    for nombre in participantes:
+        clase_participante(nombre)
+
+    procesos = procesos if procesos > 0 else os.cpu_count()
+    tareas = [range(inicio, min(inicio + PARTIDAS_POR_TAREA, cantidad)) for inicio in range(0, cantidad, PARTIDAS_POR_TAREA)]
+    argumentos = (participantes, filas, columnas, fichas_seguidas, semilla, alternar)
+
+    resumen = {"partidas": 0, "victorias": {}, "empates": 0, "errores": 0}
+    directorio = os.path.dirname(salida)
+    if directorio:
+        os.makedirs(directorio, exist_ok=True)
+
+    inicio = time.perf_counter()
+    with open(salida, 'w', encoding='utf-8') as archivo:
+        if procesos == 1:
+            lotes = (_jugar_tarea(numeros, *argumentos) for numeros in tareas)
+            pool = None
+        else:
+            pool = concurrent.futures.ProcessPoolExecutor(max_workers=procesos)
+            futuros = [pool.submit(_jugar_tarea, numeros, *argumentos) for numeros in tareas]
+            lotes = (futuro.result() for futuro in concurrent.futures.as_completed(futuros))
+
+        try:
+            for lote in lotes:
+                for registro in lote:
+                    archivo.write(json.dumps(registro) + "\n")
+                    resumen["partidas"] += 1
+                    if registro["resultado"] == "victoria":
+                        # Con la ficha se distinguen dos participantes de la misma clase
+                        indice = registro["fichas"].index(registro["ganador"])
+                        ganador = f'{registro["jugadores"][indice]} ({registro["ganador"]})'
+                        resumen["victorias"][ganador] = resumen["victorias"].get(ganador, 0) + 1
+                    elif registro["resultado"] == "empate":
+                        resumen["empates"] += 1
+                    else:
+                        resumen["errores"] += 1
+                archivo.flush()
+        finally:
+            if pool is not None:
+                pool.shutdown(cancel_futures=True)
+
+    duracion = time.perf_counter() - inicio
+    resumen["segundos"] = duracion
+    resumen["partidas_por_segundo"] = resumen["partidas"] / duracion if duracion else 0
+    return resumen
+
+def main(argumentos=None):
+    parser = argparse.ArgumentParser(description="Juega partidas entre dos participantes sin interfaz.")
+    parser.add_argument("--partidas", type=int, default=100)
+    parser.add_argument("--jugador-1", default="Minimax_AI")
+    parser.add_argument("--jugador-2", default="Aleatorio_AI")
+    parser.add_argument("--filas", type=int, default=TABLERO_FILAS)
+    parser.add_argument("--columnas", type=int, default=TABLERO_COLUMNAS)
+    parser.add_argument("--fichas-seguidas", type=int, default=FICHAS_SEGUIDAS_GANAR)
+    parser.add_argument("--procesos", type=int, default=0, help="Procesos del pool (0 usa todos los nucleos).")
+    parser.add_argument("--semilla", type=int, default=0)
+    parser.add_argument("--sin-alternar", action="store_true", help="El jugador 1 empieza todas las partidas.")
+    parser.add_argument("--salida", default="autojuego.jsonl", help="Archivo JSONL con una partida por linea.")
+    opciones = parser.parse_args(argumentos)
+
+    resumen = jugar_partidas(opciones.partidas, (opciones.jugador_1, opciones.jugador_2), opciones.filas,
+                             opciones.columnas, opciones.fichas_seguidas, opciones.salida,
+                             opciones.procesos, opciones.semilla, not opciones.sin_alternar)
+    print(json.dumps(resumen))
+
+if __name__ == "__main__":
+    main()
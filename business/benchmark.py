@@ -0,0 +1,222 @@
+"""Mediciones de rendimiento de la IA y del tablero sobre un conjunto fijo de posiciones.
+
+    python -m business.benchmark --salida benchmark.json
+    python -m business.benchmark --comparar benchmark.json
+
+Las posiciones se generan siempre igual a partir de una semilla por configuracion, y la IA
+busca con profundidad fija (sin limite de tiempo), asi los nodos visitados se pueden comparar
+entre versiones. El resultado es un JSON con nodos, nodos por segundo, percentiles de
+latencia y memoria pico de cada operacion medida.
+"""
+
+import argparse
+import json
+import platform
+import random
+import statistics
+import sys
+import time
+import tracemalloc
+import business.tablero_tateti as tablero_tateti
+import business.jugador as jugador
+import business.autojuego as autojuego
+
+# Configuraciones medidas por defecto: (filas, columnas, fichas seguidas, jugadas de cada posicion)
+CONFIGURACIONES = {
+    "3x3_3": (3, 3, 3, (1, 2, 3, 4, 1, 2, 3, 4)),
+    "4x4_3": (4, 4, 3, (2, 3, 4, 5, 6, 4)),
+    "5x5_4": (5, 5, 4, (2, 4, 6, 8))
+}
+# Llamadas por muestra en las operaciones del tablero, que por si solas duran menos de lo que mide el reloj
+REPETICIONES = 200
+# Una operacion se considera mas lenta si empeora mas que esta proporcion
+TOLERANCIA = 0.10
+
+def generar_posiciones(filas: int, columnas: int, fichas_seguidas: int, jugadas: tuple[int, ...]) -> list[list[tuple[int, int]]]:
+    """Movimientos de cada posicion del conjunto, jugados al azar con una semilla fija.
+
+    Se descartan las partidas que terminan antes de llegar a la cantidad de jugadas pedida.
+    """
+    generador = random.Random(f'benchmark/{filas}x{columnas}/{fichas_seguidas}')
+    fichas = [jugador.Ficha("X"), jugador.Ficha("O")]
+    posiciones = []
+
+    for cantidad in jugadas:
+        while True:
+            tablero = tablero_tateti.TableroTateti(filas, columnas)
+            movimientos = []
+            for jugada in range(cantidad):
+                x, y = generador.choice(tablero.moves)
+                tablero.insertar_elemento(x, y, fichas[jugada % 2])
+                movimientos.append((x, y))
+                if tablero.check_ganador_desde(x, y, fichas[jugada % 2], fichas_seguidas) or tablero.tablero_lleno():
+                    break
+            else:
+                posiciones.append(movimientos)
+                break
+
+    return posiciones
+
+def percentiles(muestras: list[float]) -> dict:
+    """Percentiles 50, 90 y 99 de las muestras, en segundos."""
+    if len(muestras) == 1:
+        return {"p50": muestras[0], "p90": muestras[0], "p99": muestras[0]}
+    cortes = statistics.quantiles(muestras, n=100, method='inclusive')
+    return {"p50": cortes[49], "p90": cortes[89], "p99": cortes[98]}
+
+def preparar_partida(filas: int, columnas: int, fichas_seguidas: int, movimientos: list[tuple[int, int]]):
+    """Partida con los movimientos jugados, con la IA a cargo del proximo turno."""
+    ia = jugador.Minimax_AI()
+    rival = jugador.Aleatorio_AI()
+    ia.procesos = 1
+    ia.tiempo_por_movimiento = None
+    ia.tiempo_ponderacion = None
+
+    # La IA juega con la ficha a la que le toca mover; X empieza
+    participantes = [ia, rival] if len(movimientos) % 2 == 0 else [rival, ia]
+    for participante, simbolo in zip(participantes, ("X", "O")):
+        participante.set_ficha(jugador.Ficha(simbolo))
+
+    partida = autojuego.PartidaHeadless(participantes, filas, columnas, fichas_seguidas)
+    for x, y in movimientos:
+        partida.aplicar_movimiento(x, y)
+    return partida, ia
+
+def medir_ia(filas: int, columnas: int, fichas_seguidas: int, posiciones: list) -> dict:
+    """Nodos, latencia y memoria de Minimax_AI.best_action en cada posicion, con una IA nueva por posicion."""
+    nodos = 0
+    latencias = []
+    for movimientos in posiciones:
+        partida, ia = preparar_partida(filas, columnas, fichas_seguidas, movimientos)
+        inicio = time.perf_counter()
+        ia.best_action(partida)
+        latencias.append(time.perf_counter() - inicio)
+        nodos += ia.contador
+
+    # La memoria se mide aparte porque tracemalloc hace mas lenta la busqueda
+    pico = 0
+    tracemalloc.start()
+    for movimientos in posiciones:
+        partida, ia = preparar_partida(filas, columnas, fichas_seguidas, movimientos)
+        tracemalloc.reset_peak()
+        antes = tracemalloc.get_traced_memory()[0]
+        ia.best_action(partida)
+        pico = max(pico, tracemalloc.get_traced_memory()[1] - antes)
+    tracemalloc.stop()
+
+    total = sum(latencias)
+    return {
+        "posiciones": len(posiciones),
+        "nodos": nodos,
+        "segundos": total,
+        "nodos_por_segundo": nodos / total if total else 0,
+        "latencia": percentiles(latencias),
+        "memoria_pico": pico
+    }
+
+def medir_operacion(tableros: list, operacion) -> dict:
+    """Latencia por llamada y memoria de una operacion del tablero, en muestras de REPETICIONES llamadas."""
+    muestras = []
+    for tablero in tableros:
+        inicio = time.perf_counter()
+        for _ in range(REPETICIONES):
+            operacion(tablero)
+        muestras.append((time.perf_counter() - inicio) / REPETICIONES)
+
+    tracemalloc.start()
+    antes = tracemalloc.get_traced_memory()[0]
+    for tablero in tableros:
+        operacion(tablero)
+    pico = tracemalloc.get_traced_memory()[1] - antes
+    tracemalloc.stop()
+
+    promedio = statistics.fmean(muestras)
+    return {
+        "llamadas": len(tableros) * REPETICIONES,
+        "operaciones_por_segundo": 1 / promedio if promedio else 0,
+        "latencia": percentiles(muestras),
+        "memoria_pico": pico
+    }
+
+def medir_configuracion(filas: int, columnas: int, fichas_seguidas: int, jugadas: tuple[int, ...]) -> dict:
+    """Todas las mediciones de una configuracion de tablero."""
+    posiciones = generar_posiciones(filas, columnas, fichas_seguidas, jugadas)
+    tableros = [preparar_partida(filas, columnas, fichas_seguidas, movimientos)[0].tablero() for movimientos in posiciones]
+    fichas = [jugador.Ficha("X"), jugador.Ficha("O")]
+
+    def check_patrones(tablero):
+        for ficha in fichas:
+            tablero.check_patrones(ficha, fichas_seguidas)
+
+    return {
+        "best_action": medir_ia(filas, columnas, fichas_seguidas, posiciones),
+        "check_patrones": medir_operacion(tableros, check_patrones),
+        "moves": medir_operacion(tableros, lambda tablero: tablero.moves),
+        "clone": medir_operacion(tableros, lambda tablero: tablero.clone())
+    }
+
+def ejecutar(nombres: list[str] = None) -> dict:
+    """Corre las configuraciones pedidas (todas por defecto) y devuelve el informe."""
+    nombres = nombres or list(CONFIGURACIONES)
+    informe = {
+        "python": platform.python_version(),
+        "plataforma": platform.platform(),
+        "fecha": time.strftime('%Y-%m-%dT%H:%M:%S'),
+        "configuraciones": {}
+    }
+    for nombre in nombres:
+        if nombre not in CONFIGURACIONES:
+            raise ValueError(f'Configuracion desconocida ({nombre}), opciones: {", ".join(CONFIGURACIONES)}')
+        informe["configuraciones"][nombre] = medir_configuracion(*CONFIGURACIONES[nombre])
+    return informe
+
+def comparar(anterior: dict, actual: dict, tolerancia: float = TOLERANCIA) -> list[str]:
+    """Operaciones que empeoraron mas que 'tolerancia' en nodos, latencia p50 o memoria pico."""
+    regresiones = []
+    for nombre, operaciones in actual["configuraciones"].items():
+        for operacion, datos in operaciones.items():
+            previos = anterior.get("configuraciones", {}).get(nombre, {}).get(operacion)
+            if previos is None:
+                continue
+
+            metricas = [("latencia p50", previos["latencia"]["p50"], datos["latencia"]["p50"]),
+                        ("memoria pico", previos["memoria_pico"], datos["memoria_pico"])]
+            if "nodos" in datos:
+                metricas.append(("nodos", previos["nodos"], datos["nodos"]))
+
+            for metrica, antes, ahora in metricas:
+                if antes and ahora > antes * (1 + tolerancia):
+                    regresiones.append(f'{nombre} {operacion}: {metrica} {antes:.6g} -> {ahora:.6g}')
+    return regresiones
+
+def main(argumentos=None):
+    parser = argparse.ArgumentParser(description="Mide el rendimiento de la IA y del tablero.")
+    parser.add_argument("--configuraciones", nargs="*", default=None, help=f'Por defecto: {" ".join(CONFIGURACIONES)}.')
+    parser.add_argument("--salida", default=None, help="Archivo JSON del informe (por defecto se imprime).")
+    parser.add_argument("--comparar", default=None, help="Informe anterior, termina con error si hay regresiones.")
+    parser.add_argument("--tolerancia", type=float, default=TOLERANCIA)
+    opciones = parser.parse_args(argumentos)
+
+    # El informe anterior se lee antes, por si se guarda el nuevo en el mismo archivo
+    anterior = None
+    if opciones.comparar:
+        with open(opciones.comparar, encoding='utf-8') as archivo:
+            anterior = json.load(archivo)
+
+    informe = ejecutar(opciones.configuraciones)
+
+    if opciones.salida:
+        with open(opciones.salida, 'w', encoding='utf-8') as archivo:
+            json.dump(informe, archivo, indent=2)
+    else:
+        print(json.dumps(informe, indent=2))
+
+    if anterior is not None:
+        regresiones = comparar(anterior, informe, opciones.tolerancia)
+        for regresion in regresiones:
+            print(f'Regresion: {regresion}', file=sys.stderr)
+        if regresiones:
+            sys.exit(1)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,116 @@
+"""Estado de una partida de Ta-Te-Ti, separado de la entrada y la pantalla.
+
+Un EstadoTateti no cambia: apply_move devuelve un estado nuevo con su propia copia del
+tablero, asi el mismo estado se puede compartir entre hilos, guardar para deshacer o mandar
+a otro proceso con pickle.
+
+    partida = EstadoTateti(3, 3, 3, [Ficha("X"), Ficha("O")])
+    partida = partida.apply_move(2, 2)
+    partida.status(), partida.next_player(), partida.legal_moves()
+"""
+
+import business.tablero_tateti as tablero_tateti
+import business.jugador as jugador
+
+JUGANDO = "jugando"
+VICTORIA = "victoria"
+EMPATE = "empate"
+
+class EstadoTateti():
+    """Posicion, turno y resultado de una partida."""
+
+    def __init__(self, filas: int, columnas: int, fichas_seguidas: int, fichas: list["jugador.Ficha"], indice_turno: int = 0):
+        """Estado inicial, con el tablero vacio.
+
+        Args:
+            filas (int): Filas del tablero.
+            columnas (int): Columnas del tablero.
+            fichas_seguidas (int): Fichas en linea necesarias para ganar.
+            fichas (list[Ficha]): Ficha de cada jugador, en el orden en que se turnan.
+            indice_turno (int): Indice en 'fichas' del jugador que empieza.
+        """
+        if not all(isinstance(ficha, jugador.Ficha) for ficha in fichas) or len(fichas) < 2:
+            raise TypeError("Se necesitan al menos dos fichas.")
+        if indice_turno < 0 or indice_turno >= len(fichas):
+            raise IndexError(f'Indice fuera de rango (1 - {len(fichas)})')
+
+        self.__tablero = tablero_tateti.TableroTateti(filas, columnas)
+        self.__fichas = tuple(fichas)
+        self.__fichas_seguidas = fichas_seguidas
+        self.__indice_turno = indice_turno
+        self.__ultimo_movimiento = None
+        self.__status = JUGANDO
+        self.__ganador = None
+
+    # Getters
+    def tablero(self) -> "tablero_tateti.TableroTateti":
+        """El tablero de este estado, no se debe modificar."""
+        return self.__tablero
+
+    def fichas(self) -> tuple:
+        return self.__fichas
+
+    def fichas_seguidas(self):
+        return self.__fichas_seguidas
+
+    def indice_turno(self):
+        """Indice de la ficha que mueve, o de la que movio ultima si la partida termino."""
+        return self.__indice_turno
+
+    def ultimo_movimiento(self):
+        return self.__ultimo_movimiento
+
+    def ganador(self):
+        return self.__ganador
+
+    def status(self) -> str:
+        """JUGANDO, VICTORIA o EMPATE."""
+        return self.__status
+
+    def next_player(self):
+        """Ficha del jugador al que le toca mover, None si la partida termino."""
+        if self.__status != JUGANDO:
+            return None
+        return self.__fichas[self.__indice_turno]
+
+    def legal_moves(self) -> tuple[tuple[int, int], ...]:
+        """Movimientos (x, y) disponibles, ninguno si la partida termino."""
+        if self.__status != JUGANDO:
+            return ()
+        return self.__tablero.moves
+
+    def apply_move(self, x: int, y: int) -> "EstadoTateti":
+        """Estado que resulta de que el jugador del turno ponga su ficha en (x, y).
+
+        Raises:
+            PartidaTerminadaError: Si la partida ya termino.
+            TypeError: Si las coordenadas no son enteros.
+            ValueError: Si las coordenadas estan fuera del tablero.
+            OcupadoError: Si el casillero esta ocupado.
+        """
+        if self.__status != JUGANDO:
+            raise PartidaTerminadaError("La partida ya termino")
+
+        ficha = self.__fichas[self.__indice_turno]
+        tablero = self.__tablero.clone()
+        tablero.insertar_elemento(x, y, ficha)
+
+        siguiente = object.__new__(EstadoTateti)
+        siguiente.__tablero = tablero
+        siguiente.__fichas = self.__fichas
+        siguiente.__fichas_seguidas = self.__fichas_seguidas
+        siguiente.__indice_turno = self.__indice_turno
+        siguiente.__ultimo_movimiento = (x, y)
+        siguiente.__status = JUGANDO
+        siguiente.__ganador = None
+
+        if tablero.check_ganador_desde(x, y, ficha, self.__fichas_seguidas):
+            siguiente.__status, siguiente.__ganador = VICTORIA, ficha
+        elif tablero.tablero_lleno():
+            siguiente.__status = EMPATE
+        else:
+            siguiente.__indice_turno = (self.__indice_turno + 1) % len(self.__fichas)
+        return siguiente
+
+class PartidaTerminadaError(Exception):
+    pass
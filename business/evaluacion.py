@@ -0,0 +1,83 @@
+"""Funciones de evaluacion para posiciones donde la IA corta la busqueda por profundidad."""
+
+from abc import ABC, abstractmethod
+import business.tablero_bitboard as tablero_bitboard
+
+class Evaluador(ABC):
+    """Estimacion del valor de una posicion que no termino."""
+
+    @abstractmethod
+    def evaluar(self, tablero: "tablero_bitboard.TableroBitboard", ficha, ficha_rival, fichas_seguidas: int) -> float:
+        """Evalua una posicion desde el punto de vista de 'ficha'.
+
+        Args:
+            tablero (TableroBitboard): La posicion a evaluar.
+            ficha (Ficha): La ficha para la que se evalua.
+            ficha_rival (Ficha): La ficha del rival.
+            fichas_seguidas (int): Fichas en linea necesarias para ganar.
+
+        Returns:
+            float: Un valor estrictamente entre -1 y 1, para no confundirse con una victoria o derrota.
+        """
+
+def contar_por_linea(mascara: int, inicios: int, desplazamiento: int, fichas_seguidas: int) -> list[int]:
+    """Cuenta, para todas las lineas de una direccion a la vez, cuantos bits de 'mascara' tiene cada una.
+
+    Cada linea se representa por el bit de su primer casillero. El conteo se suma en binario
+    con un entero por cada bit del resultado, asi el costo depende de 'fichas_seguidas' y no
+    de la cantidad de lineas.
+
+    Returns:
+        list[int]: Los planos del conteo, el bit b de la linea esta en el plano b.
+    """
+    planos = []
+    for i in range(fichas_seguidas):
+        acarreo = (mascara >> (desplazamiento * i)) & inicios
+        for b in range(len(planos)):
+            planos[b], acarreo = planos[b] ^ acarreo, planos[b] & acarreo
+        if acarreo:
+            planos.append(acarreo)
+    return planos
+
+def lineas_con(planos: list[int], inicios: int, cantidad: int) -> int:
+    """Mascara de las lineas cuyo conteo en 'planos' es exactamente 'cantidad'."""
+    resultado = inicios
+    for b, plano in enumerate(planos):
+        resultado &= plano if cantidad >> b & 1 else ~plano
+    if cantidad >> len(planos):
+        return 0
+    return resultado
+
+class EvaluadorLineas(Evaluador):
+    """Puntua cada linea que todavia puede completar un solo jugador, segun cuantas fichas suyas tiene.
+
+    Una linea con n fichas propias y ninguna del rival suma base ** n, y al reves resta.
+    """
+
+    def __init__(self, base: int = 4):
+        self.__base = base
+
+    def evaluar(self, tablero, ficha, ficha_rival, fichas_seguidas):
+        filas, columnas = tablero.filas(), tablero.columnas()
+        propia, rival = tablero.mascara(ficha), tablero.mascara(ficha_rival)
+
+        puntaje = 0
+        for desplazamiento, inicios in tablero_bitboard.desplazamientos_ganadores(filas, columnas, fichas_seguidas):
+            bloqueadas_propia = 0
+            bloqueadas_rival = 0
+            for i in range(fichas_seguidas):
+                bloqueadas_propia |= rival >> (desplazamiento * i)
+                bloqueadas_rival |= propia >> (desplazamiento * i)
+
+            abiertas_propia = inicios & ~bloqueadas_propia
+            abiertas_rival = inicios & ~bloqueadas_rival
+            planos_propia = contar_por_linea(propia, abiertas_propia, desplazamiento, fichas_seguidas)
+            planos_rival = contar_por_linea(rival, abiertas_rival, desplazamiento, fichas_seguidas)
+
+            for cantidad in range(1, fichas_seguidas + 1):
+                peso = self.__base ** cantidad
+                puntaje += peso * lineas_con(planos_propia, abiertas_propia, cantidad).bit_count()
+                puntaje -= peso * lineas_con(planos_rival, abiertas_rival, cantidad).bit_count()
+
+        maximo = len(tablero_bitboard.lineas_ganadoras(filas, columnas, fichas_seguidas)) * self.__base ** fichas_seguidas
+        return puntaje / (maximo + 1)
@@ -1,47 +1,79 @@
 """Juego de tablero 'Ta-Te-Ti'"""
 
+import asyncio
+import concurrent.futures
+import sys
+import threading
 from business.tablero_tateti import *
 from business.jugador import *
-from presentation.terminal_UI import TaTeTiTerminalUI
+from business.estado import EstadoTateti, PartidaTerminadaError, VICTORIA, EMPATE
+from presentation.terminal_UI import TaTeTiTerminalUI, RITMO_HEADLESS
 from presentation.interfaces import IJuegoUI
 from settings import (
     TABLERO_FILAS,
     TABLERO_COLUMNAS,
     FICHAS_SEGUIDAS_GANAR,
     FICHAS_DEFAULT,
-    NOMBRE_JUGADOR_HUMANO
+    NOMBRE_JUGADOR_HUMANO,
+    JUEGO_ASINCRONICO,
+    UI_RITMO
 )
 
+# Cada cuantos segundos se actualiza la animacion mientras piensa la IA
+INTERVALO_ESPERA = 0.1
+
+# Etapas del juego, ver Tateti.procesar
+ETAPA_MENU = "menu"
+ETAPA_JUGADOR_INICIAL = "jugador_inicial"
+ETAPA_TURNO = "turno"
+ETAPA_FIN_PARTIDA = "fin_partida"
+ETAPA_SALIDA = "salida"
+
 class Tateti():
     """Juego de tateti Player VS AI donde la IA siempre gana o empata."""
-    def __init__(self):
-        self.__tablero = TableroTateti(TABLERO_FILAS, TABLERO_COLUMNAS)
+    def __init__(self, ritmo: str = UI_RITMO):
         self.__cant_jugadores = 2
         self.__fichas_seguidas = FICHAS_SEGUIDAS_GANAR
 
-        self.__corriendo = True
-        self.__UI: IJuegoUI = TaTeTiTerminalUI(self)
+        self.__etapa = ETAPA_MENU
+        # Error del ultimo evento, se muestra al volver a pedir la entrada
+        self.__mensaje_error = None
         self.__jugadores = []
         self.__fichas = []
         self.__fichas_default = [Ficha(simbolo) for simbolo in FICHAS_DEFAULT]
+        # Jugador que empieza la partida, el turno en curso lo lleva el estado
         self.__indice_turno = 0
+        # Las reglas de la partida en curso, se reemplaza despues de cada movimiento
+        self.__estado = EstadoTateti(TABLERO_FILAS, TABLERO_COLUMNAS, self.__fichas_seguidas, self.__fichas_default[:2])
+        self.__ritmo = ritmo
+        self.__UI: IJuegoUI = TaTeTiTerminalUI(self, ritmo)
+        # Lineas de la entrada leidas de una vez en el ritmo headless, None lee con input()
+        self.__entradas = None
+        # Reciben las estadisticas de cada movimiento de las IA (ver Minimax_AI.suscribir)
+        self.__observadores_ia = []
+
+        # La IA busca en un hilo aparte cuando el juego es asincronico
+        self.__executor = None
 
         # Opciones de menu
-        self.__opciones_menu_principal = [("Jugar", self.__jugar), ("Salir", self.__salir_del_juego)]
+        self.__opciones_menu_principal = [("Jugar", self.__nueva_partida), ("Salir", self.__salir_del_juego)]
 
     @property
     def __jugador_actual(self):
-        return self.__jugadores[self.__indice_turno]
+        return self.__jugadores[self.__estado.indice_turno()]
     
     # Getters
     def tablero(self):
-        return self.__tablero
+        return self.__estado.tablero()
+
+    def estado(self):
+        return self.__estado
 
     def jugadores(self):
         return self.__jugadores
 
     def indice_turno(self):
-        return self.__indice_turno
+        return self.__estado.indice_turno()
 
     def cant_jugadores(self):
         return self.__cant_jugadores
@@ -58,6 +90,12 @@ class Tateti():
     def jugador_actual(self):
         return self.__jugador_actual
 
+    def etapa(self):
+        return self.__etapa
+
+    def mensaje_error(self):
+        return self.__mensaje_error
+
     # Setters
     def __set_indice_turno(self, indice):
         if indice < 0 or indice > len(self.__jugadores)-1:
@@ -65,88 +103,257 @@ class Tateti():
 
         self.__indice_turno = indice
 
+    def suscribir_estadisticas(self, observador):
+        """Suscribe un observador a las estadisticas de las IA de esta partida y las siguientes.
+
+        Args:
+            observador: Funcion que recibe (ia, EstadisticasMovimiento) despues de cada movimiento de una IA.
+        """
+        if observador not in self.__observadores_ia:
+            self.__observadores_ia.append(observador)
+        self.__conectar_observadores()
+
+    def desuscribir_estadisticas(self, observador):
+        if observador in self.__observadores_ia:
+            self.__observadores_ia.remove(observador)
+        for jugador in self.__jugadores:
+            if isinstance(jugador, Minimax_AI):
+                jugador.desuscribir(observador)
+
     # Métodos
     @classmethod
-    def iniciar(clase):
-        """Inicia el juego de Ta-Te-Ti"""
-        tateti = clase()
+    def iniciar(clase, ritmo: str = None):
+        """Inicia el juego de Ta-Te-Ti
+
+        Args:
+            ritmo (str): Ritmo de la interfaz, por defecto UI_RITMO. En RITMO_HEADLESS se lee toda
+                la entrada estandar al empezar: una linea por opcion del menu, por jugador inicial
+                y por movimiento ("x y" o "x,y"). El juego termina cuando se acaban las lineas.
+        """
+        tateti = clase(UI_RITMO if ritmo is None else ritmo)
+        if tateti.__ritmo == RITMO_HEADLESS:
+            tateti.__entradas = iter(sys.stdin.read().splitlines())
         tateti.__UI.pantalla_bienvenida()
-        tateti.__menu()
+        tateti.__ejecutar()
 
-    def __menu(self, mensaje_error = None):
-        """Etapa donde se recorre el menu principal"""
-        while self.__corriendo:
-            self.__UI.cls()
+    def __ejecutar(self):
+        """Muestra la etapa actual y le pasa la entrada del usuario o de la IA, hasta salir del juego.
+
+        Cada vuelta procesa un solo evento, asi la pila no crece con los reintentos ni con las partidas.
+        """
+        while self.__etapa != ETAPA_SALIDA:
+            try:
+                if self.__etapa == ETAPA_TURNO and JUEGO_ASINCRONICO:
+                    asyncio.run(self.jugar_async())
+                    continue
+
+                self.__mostrar_etapa()
+                self.procesar(self.__leer_evento())
+            except EOFError:
+                # Se termino la entrada, no hay mas eventos para procesar
+                self.__abandonar_partida()
+                self.__etapa = ETAPA_SALIDA
+            except KeyboardInterrupt:
+                # Fuera de una partida se sale del juego
+                if self.__etapa == ETAPA_MENU:
+                    raise
+                # La busqueda ya se cancelo, la partida se abandona
+                self.__abandonar_partida()
+            except Exception as e:
+                if self.__etapa == ETAPA_MENU:
+                    raise
+                print(f'ERROR: {e}')
+                self.__abandonar_partida()
+
+    def procesar(self, evento):
+        """Avanza el juego con un evento de la etapa actual.
+
+        Args:
+            evento: En ETAPA_MENU y ETAPA_JUGADOR_INICIAL, el texto ingresado. En ETAPA_TURNO,
+                las coordenadas (x, y) del jugador actual. En ETAPA_FIN_PARTIDA se ignora y se
+                vuelve al menu.
+
+        Si el evento no es valido la etapa no cambia y queda el motivo en mensaje_error().
+        """
+        self.__mensaje_error = None
+
+        if self.__etapa == ETAPA_MENU:
+            self.__elegir_opcion(evento)
+        elif self.__etapa == ETAPA_JUGADOR_INICIAL:
+            self.__elegir_jugador_inicial(evento)
+        elif self.__etapa == ETAPA_TURNO:
+            self.__realizar_movimiento(*evento)
+        elif self.__etapa == ETAPA_FIN_PARTIDA:
+            self.__terminar_partida()
+            self.__etapa = ETAPA_MENU
+
+    def __mostrar_etapa(self):
+        """Muestra la etapa actual en la interfaz"""
+        if self.__etapa == ETAPA_TURNO:
+            self.__mostrar_turno(self.__jugador_actual, self.__mensaje_error)
+            return
+
+        if self.__etapa == ETAPA_FIN_PARTIDA:
+            if self.__estado.status() == VICTORIA:
+                self.__UI.mensaje_ganador()
+            else:
+                self.__UI.mensaje_empate()
+            return
+
+        self.__UI.cls()
+        if self.__etapa == ETAPA_MENU:
             self.__UI.mostrar_opciones_menu_principal()
+        else:
+            self.__UI.mostrar_opciones_eleccion_jugador_inicial()
+
+        # Si se generó un mensaje de error, se muestra
+        if self.__mensaje_error is not None:
+            self.__UI.mostrar_error(self.__mensaje_error)
+
+    def __leer_evento(self):
+        """Pide la entrada de la etapa actual"""
+        if self.__etapa == ETAPA_MENU:
+            return self.__leer_linea('Opcion: ')
+        if self.__etapa == ETAPA_JUGADOR_INICIAL:
+            return self.__leer_linea('Elige un jugador para que comience la partida: ')
+        if self.__etapa == ETAPA_TURNO:
+            # Se devuelven las elecciones del jugador
+            return self.__pedir_movimiento(self.__jugador_actual)
+        return None
+
+    def __leer_linea(self, mensaje: str) -> str:
+        """Lee una linea con input(), o la siguiente de la entrada si se leyo de una vez.
+
+        Raises:
+            EOFError: Si no quedan lineas.
+        """
+        if self.__entradas is None:
+            return input(mensaje)
 
-            # Si se generó un mensaje de error, se muestra
-            if mensaje_error is not None:
-                self.__UI.mostrar_error(mensaje_error)
+        linea = next(self.__entradas, None)
+        if linea is None:
+            raise EOFError
+        # Se repite la entrada para que la salida se lea como una partida jugada a mano
+        print(f'{mensaje}{linea}')
+        return linea
 
-            eleccion = input('Opcion: ')
+    def __pedir_movimiento(self, jugador: "ParticipanteTateti") -> tuple[str, str]:
+        """Coordenadas del participante; las de los jugadores humanos salen de la entrada si se leyo de una vez."""
+        if self.__entradas is None or not isinstance(jugador, Jugador):
+            return jugador.colocar_ficha(self)
 
-            try:
-                if int(eleccion) > 0: #Evita que se utilicen indices negativos
-                    # Ejecuta el método del menu principal
-                    self.__opciones_menu_principal[int(eleccion)-1][1]()
-                else:
-                    raise IndexError
-            except ValueError:
-                self.__menu(mensaje_error = f'Opción no válida ({eleccion} no es un número)')
-            except IndexError:
-                # Número fuera de rango
-                self.__menu(mensaje_error = f'Opción no válida ({eleccion} no esta en (1 - {len(self.__opciones_menu_principal)}))')
-
-    def __jugar(self):
-        """Inicia un partida"""
+        x, _, y = self.__leer_linea('Movimiento (x y): ').replace(",", " ").strip().partition(" ")
+        return x, y
+
+    def __elegir_opcion(self, eleccion: str):
+        """Etapa donde se recorre el menu principal"""
         try:
-            self.__set_up_inicial()
+            opcion = int(eleccion)
+        except ValueError:
+            self.__mensaje_error = f'Opción no válida ({eleccion} no es un número)'
+            return
 
-            while True:
-                self.__realizar_movimiento(self.__jugador_actual)
+        # Evita que se utilicen indices negativos
+        if opcion < 1 or opcion > len(self.__opciones_menu_principal):
+            self.__mensaje_error = f'Opción no válida ({eleccion} no esta en (1 - {len(self.__opciones_menu_principal)}))'
+            return
 
-                # Si hay ganador
-                if self.__check_ganador(self.__jugador_actual):
-                    self.__UI.mensaje_ganador()
-                    self.__reset_tablero()
-                    break
+        # Ejecuta el método del menu principal
+        self.__opciones_menu_principal[opcion - 1][1]()
 
-                # Si hay empate
-                if self.__check_empate():
-                    self.__UI.mensaje_empate()
-                    self.__reset_tablero()     
-                    break
+    async def jugar_async(self):
+        """Juega los turnos de la partida en curso en un event loop. Mientras la IA busca, la interfaz muestra que esta pensando."""
+        while self.__etapa == ETAPA_TURNO:
+            self.__mostrar_etapa()
+            self.procesar(await self.movimiento_async(self.__jugador_actual))
 
-                self.__siguiente_jugador()
+    async def movimiento_async(self, jugador: "ParticipanteTateti") -> tuple[str, str]:
+        """Pide el movimiento a un participante sin bloquear el event loop.
 
-            # Si termina la partida
-            self.__menu()
-        except KeyboardInterrupt:
-            self.__menu()
-        except Exception as e:
-            print(f'ERROR: {e}')
+        Las IA buscan en un hilo aparte; si se cancela la espera (por ejemplo con Ctrl+C) se
+        cancela tambien su busqueda. Los demas participantes se consultan directamente.
+
+        Returns:
+            tuple[str, str]: Las coordenadas elegidas.
+        """
+        if not isinstance(jugador, Minimax_AI):
+            return self.__pedir_movimiento(jugador)
+
+        if self.__executor is None:
+            self.__executor = concurrent.futures.ThreadPoolExecutor(max_workers=1)
+
+        # Se crea antes de mandar la busqueda al hilo, asi se puede cancelar aunque todavia no haya empezado
+        cancelacion = threading.Event()
+        futuro = asyncio.get_running_loop().run_in_executor(self.__executor, jugador.colocar_ficha, self, cancelacion)
+        cuadro = 0
+        try:
+            while True:
+                listos, _ = await asyncio.wait({futuro}, timeout=INTERVALO_ESPERA)
+                if listos:
+                    return futuro.result()
+                self.__UI.mostrar_pensando(jugador, cuadro)
+                cuadro += 1
+        except asyncio.CancelledError:
+            cancelacion.set()
+            # Se espera a que el hilo termine para no dejar la busqueda usando el tablero
+            await asyncio.wait({futuro})
+            # La busqueda cancelada termina con BusquedaInterrumpida, se descarta
+            if not futuro.cancelled():
+                futuro.exception()
+            raise
 
     def __salir_del_juego(self):
         """Termina la ejecucion del juego"""
         self.__UI.cls()
-        self.__corriendo = False
+        self.__etapa = ETAPA_SALIDA
 
-    def __set_up_inicial(self):
-        """Establece un estado inicial para empezar la partida"""
+    def __nueva_partida(self):
+        """Prepara los jugadores y pasa a la eleccion del jugador inicial"""
         self.__reset_jugadores()
         self.__reset_fichas()
         self.__settear_nombres()
-        self.__elegir_jugador_inicial()
-        self.__settear_fichas()
+        self.__conectar_observadores()
+        self.__etapa = ETAPA_JUGADOR_INICIAL
 
     def __reset_jugadores(self):
         """Se resetean los jugadores"""
         self.__jugadores.clear()
-        self.__jugadores.append(Minimax_AI())
+        ia = Minimax_AI()
+        if self.__ritmo == RITMO_HEADLESS:
+            # Sin pensar en el turno del rival, asi una misma entrada siempre da la misma partida
+            ia.tiempo_ponderacion = None
+        self.__jugadores.append(ia)
+
+    def __conectar_observadores(self):
+        """Suscribe los observadores de estadisticas a las IA actuales"""
+        for jugador in self.__jugadores:
+            if isinstance(jugador, Minimax_AI):
+                for observador in self.__observadores_ia:
+                    jugador.suscribir(observador)
+
+    def __terminar_partida(self):
+        """Deja todo listo para la proxima partida"""
+        self.__detener_ponderaciones()
+        self.__reset_tablero()
+
+    def __abandonar_partida(self):
+        """Vuelve al menu dejando la partida en curso, si la hay"""
+        if self.__etapa != ETAPA_MENU:
+            self.__terminar_partida()
+            self.__etapa = ETAPA_MENU
+
+    def __detener_ponderaciones(self):
+        """Las IA dejan de pensar en el turno del rival"""
+        for jugador in self.__jugadores:
+            if isinstance(jugador, Minimax_AI):
+                jugador.detener_ponderacion()
 
     def __reset_tablero(self):
-        """Se resetea el tablero"""
-        self.__tablero.construir_tablero()
+        """Se resetea el tablero, empezando por el jugador inicial"""
+        fichas = [jugador.ficha() for jugador in self.__jugadores]
+        if len(fichas) < 2 or None in fichas:
+            fichas = self.__fichas_default[:2]
+        self.__estado = EstadoTateti(TABLERO_FILAS, TABLERO_COLUMNAS, self.__fichas_seguidas, fichas, self.__indice_turno)
 
     def __reset_fichas(self):
         """Se resetean las fichas"""
@@ -156,26 +363,22 @@ class Tateti():
         self.__jugadores.append(Jugador())
         self.__jugadores[1].set_nombre(NOMBRE_JUGADOR_HUMANO)
 
-    def __elegir_jugador_inicial(self, mensaje_error = None):
+    def __elegir_jugador_inicial(self, jugador_inicial: str):
         """Etapa de eleccion del jugador inicial"""
-        self.__UI.cls()
-        self.__UI.mostrar_opciones_eleccion_jugador_inicial()
-        
-        # Si hay un mensaje de error se muestra
-        if mensaje_error is not None:
-            self.__UI.mostrar_error(mensaje_error)
-            
-        jugador_inicial = input('Elige un jugador para que comience la partida: ')
-
         try:
             self.__set_indice_turno(int(jugador_inicial) - 1)
-        
         except ValueError:
             # Si no se ingresa un número
-            self.__elegir_jugador_inicial(mensaje_error = f'Se debe ingresar un número ({jugador_inicial})')
+            self.__mensaje_error = f'Se debe ingresar un número ({jugador_inicial})'
+            return
         except IndexError as Error:
             # Si el indice no es válido
-            self.__elegir_jugador_inicial(mensaje_error = Error)
+            self.__mensaje_error = Error
+            return
+
+        self.__settear_fichas()
+        self.__reset_tablero()
+        self.__etapa = ETAPA_TURNO
 
     def __settear_fichas(self):
         """Setteo de fichas X y O a los primeros 2 jugadores"""
@@ -201,13 +404,13 @@ class Tateti():
             # Cuando se acaban las fichas predeterminadas
             self.__eleccion_fichas(indice_jugador + 1)
 
-    def __realizar_movimiento(self, jugador: "ParticipanteTateti", mensaje_error=None):
-        """Etapa donde un participante realiza su movimiento.
-
-        Args:
-            jugador (tablero_tateti.ParticipanteTateti): El participante que tiene su turno.
-        """
+    def __realizar_movimiento(self, x, y):
+        """Etapa donde el jugador actual realiza su movimiento"""
+        self.__mensaje_error = self.__aplicar_movimiento(self.__jugador_actual, x, y)
+        if self.__mensaje_error is None and self.__estado.status() in (VICTORIA, EMPATE):
+            self.__etapa = ETAPA_FIN_PARTIDA
 
+    def __mostrar_turno(self, jugador: "ParticipanteTateti", mensaje_error=None):
         self.__UI.cls()
         self.__UI.mostrar_tablero()
         self.__UI.mostrar_turno_jugador(jugador)
@@ -216,38 +419,21 @@ class Tateti():
         if mensaje_error is not None:
             self.__UI.mostrar_error(mensaje_error)
 
-        # Se devuelven las elecciones del jugador
-        x, y = jugador.colocar_ficha(self)
-
-        self.__UI
-
+    def __aplicar_movimiento(self, jugador: "ParticipanteTateti", x, y):
+        """Inserta la ficha del jugador. Devuelve el mensaje de error si el movimiento no es valido, o None."""
         try:
-            self.__tablero.insertar_elemento(int(x), int(y), jugador.ficha())
+            self.__estado = self.__estado.apply_move(int(x), int(y))
 
-        except TypeError as Error:
+        except (TypeError, PartidaTerminadaError) as Error:
             # Si se detecta un tipo inválido
-            self.__realizar_movimiento(jugador, mensaje_error = Error)
+            return Error
 
         except ValueError as Error:
             # Coordenadas fuera de rango
-            self.__realizar_movimiento(jugador, mensaje_error = f'Coordenadas inválidas ({x}, {y})')
+            return f'Coordenadas inválidas ({x}, {y})'
 
         except OcupadoError as Error:
             # Si el casillero está ocupado
-            self.__realizar_movimiento(jugador, mensaje_error = Error)
-
-    def __check_ganador(self, jugador: "ParticipanteTateti"):
-        """Chequea si un jugador ganó o no"""
-        return self.__tablero.check_patrones(jugador.ficha(), self.__fichas_seguidas)
-
-    def __check_empate(self):
-        """Chequea si hay empate"""
-        return self.__tablero.tablero_lleno()
-    
-    def __siguiente_jugador(self):
-        """Le da el turno al siguiente jugador"""
-        self.__indice_turno += 1
-        if self.__indice_turno == len(self.__jugadores):
-            self.__indice_turno = 0
+            return Error
 
-        self.__UI.cls()
\ No newline at end of file
+        return None
@@ -1,26 +1,84 @@
 """Clases para el funcionamiento de un Participante en una partida de Ta-Te-Ti."""
 
 import business.tablero_tateti as tablero_tateti
-import business.juego as juego
+import business.tablero_bitboard as tablero_bitboard
+import business.transposicion as transposicion
+import business.libro_aperturas as libro_aperturas
+import business.solucionador as solucionador
+import business.simetrias as simetrias
+import business.evaluacion as evaluacion
 from abc import ABC, abstractmethod
+from typing import TYPE_CHECKING
+import concurrent.futures
+import os
 import random
+import threading
+import time
+from settings import IA_MAX_ENTRADAS_TRANSPOSICION, IA_TIEMPO_POR_MOVIMIENTO, IA_PROCESOS, IA_TIEMPO_PONDERACION
+
+if TYPE_CHECKING:
+    import business.juego as juego
+
+# Cada cuantos nodos la busqueda revisa si se le acabo el tiempo o fue cancelada
+NODOS_POR_CONTROL_DE_TIEMPO = 1024
+# Cada cuantos segundos la busqueda paralela revisa si fue cancelada
+INTERVALO_CONTROL_PARALELO = 0.05
+# Killer moves que se guardan por profundidad
+CANT_KILLERS = 2
+# Margen de la ventana de la raiz para no perder empates entre movimientos
+EPSILON_EMPATE = 1e-9
+
+# De donde salio el movimiento de la IA
+ORIGEN_LIBRO = "libro"
+ORIGEN_ALEATORIO = "aleatorio"
+ORIGEN_INMEDIATO = "inmediato"
+ORIGEN_BUSQUEDA = "busqueda"
+ORIGEN_TABLEBASE = "tablebase"
+ORIGEN_PONDERACION = "ponderacion"
 
 class Ficha():
-    """Ficha insertable en un tablero"""
-    def __init__(self, simbolo):
+    """Ficha insertable en un tablero.
+
+    Hay una sola instancia por simbolo: crear otra vez Ficha("X") devuelve la misma ficha,
+    asi que comparar fichas es comparar identidades.
+    """
+    __slots__ = ('__simbolo', '__hash')
+
+    # Ficha creada para cada simbolo
+    __fichas = {}
+
+    def __new__(cls, simbolo):
+        ficha = cls.__fichas.get(simbolo) if isinstance(simbolo, str) else None
+        if ficha is not None:
+            return ficha
+
         if not isinstance(simbolo, str):
             raise TypeError("El simbolo debe ser de tipo str o convertible a ese tipo.")
         
         if len(simbolo) > 1 or simbolo == "" or simbolo == " ":
             raise ValueError("La ficha no puede estar vacia o ser mas de 1 caracter.")
 
-        self.__simbolo = str(simbolo)
+        ficha = super().__new__(cls)
+        ficha.__simbolo = str(simbolo)
+        ficha.__hash = hash(ficha.__simbolo)
+        # Si dos hilos crean la misma ficha a la vez queda una sola
+        return cls.__fichas.setdefault(simbolo, ficha)
+
+    def __reduce__(self):
+        # Al deserializar (por ejemplo en otro proceso) se vuelve a la ficha unica del simbolo
+        return (Ficha, (self.__simbolo,))
+
+    def __copy__(self):
+        return self
+
+    def __deepcopy__(self, memo):
+        return self
 
     def simbolo(self):
         return self.__simbolo
 
     def __repr__(self) -> str:
-        """Representacion de una ficha (usada para la comparacion de fichas)
+        """Representacion de una ficha.
 
         Returns:
             str: Representacion de una ficha.
@@ -36,7 +94,7 @@ class Ficha():
         return str(self.__simbolo)
 
     def __hash__(self):
-        return hash(self.simbolo())
+        return self.__hash
 
     def __eq__(self, ficha: "Ficha") -> bool:
         """Compara si dos fichas son iguales.
@@ -50,13 +108,17 @@ class Ficha():
         Returns:
             bool: Si es igual o no.
         """
+        if ficha is self:
+            return True
+
         if ficha is None:
             return False
 
         if not isinstance(ficha, Ficha):
             raise TypeError(f'No se puede comparar ficha con {type(ficha)}')
 
-        return repr(self) == repr(ficha)
+        # Las fichas son unicas por simbolo
+        return False
 
     def __lt__(self, elemento: "Ficha"):
         if elemento is None:
@@ -114,113 +176,716 @@ class Jugador(ParticipanteTateti):
     
 class Minimax_AI(ParticipanteTateti):
     """IA que utiliza un algoritmo de busqueda Minimax para elegir siempre la mejor jugada"""
-    def __init__(self):
+    def __init__(self, evaluador: "evaluacion.Evaluador" = None):
         super().__init__()
         self.set_nombre("AI")
+        # Estima las posiciones donde se corta la busqueda por profundidad
+        self.evaluador = evaluador if evaluador is not None else evaluacion.EvaluadorLineas()
         self.tablero: "tablero_tateti.Tablero" = None
         self.tablero_min_max: "tablero_tateti.Tablero" = None
         self.contador = 0
+        # Estadisticas del movimiento en curso, ver EstadisticasMovimiento. Solo se cuentan si
+        # medir_estadisticas (hay observadores); contador siempre, porque controla el tiempo
+        self.medir_estadisticas = False
+        self.cortes = 0
+        self.profundidad_maxima = 0
+        self.consultas_transposicion = 0
+        self.aciertos_transposicion = 0
+        self.origen: str = None
+        self.__observadores = []
         self.depth_limit = 0
+        self.ficha_oponente: "Ficha" = None
+        # Codigos de las fichas en self.tablero, para mover con push/pop
+        self.codigo_propio = 0
+        self.codigo_rival = 0
+        self.fichas_seguidas = 0
+        self.limite_tiempo: float = None
+        # Se activa desde otro hilo para cortar la busqueda en curso, cada busqueda del turno recibe el suyo (ver colocar_ficha)
+        self.cancelacion = threading.Event()
+        # Tiempo por movimiento, None busca con profundidad fija
+        self.tiempo_por_movimiento: float = IA_TIEMPO_POR_MOVIMIENTO
+        # Profundidad de la ultima busqueda propia que termino
+        self.profundidad_alcanzada: float = 0
+        # Segundos que piensa en el turno del rival, None no piensa
+        self.tiempo_ponderacion: float = IA_TIEMPO_PONDERACION
+        # Respuesta precalculada a cada movimiento del rival, por hash zobrist: (movimiento, profundidad)
+        self.respuestas: dict[int, tuple[tuple[int, int], float]] = {}
+        self.__ponderacion: threading.Thread = None
+        # Procesos para repartir los movimientos de la raiz, 1 busca en este proceso
+        self.procesos = IA_PROCESOS if IA_PROCESOS > 0 else os.cpu_count()
+        # Se conserva entre movimientos de la misma partida
+        self.transposiciones = transposicion.TablaTransposicion(IA_MAX_ENTRADAS_TRANSPOSICION)
+
+        # Ordenamiento de movimientos
+        self.orden_estatico: dict[tuple[int, int], int] = {}
+        self.killers: list[list[tuple[int, int]]] = []
+        # Una tabla de historia por jugador (False: rival, True: IA), se conserva en la partida
+        self.historia: dict[bool, dict[tuple[int, int], int]] = {False: {}, True: {}}
 
     def elegir_ficha(self):
         self.set_ficha(Ficha("#"))
 
-    def colocar_ficha(self, partida: "juego.Tateti"):
-        self.contador = 0
+    def colocar_ficha(self, partida: "juego.Tateti", cancelacion: threading.Event = None):
+        """Elige y devuelve el movimiento de la IA.
+
+        Args:
+            cancelacion (threading.Event, optional): Si se activa, la busqueda termina con
+                BusquedaInterrumpida. Lo crea quien pide el movimiento, asi una cancelacion
+                anterior al comienzo de la busqueda no se pierde.
+        """
+        # Llego el movimiento del rival, lo que no se penso hasta ahora se descarta
+        self.detener_ponderacion()
+        self.cancelacion = cancelacion if cancelacion is not None else threading.Event()
+        if self.cancelacion.is_set():
+            raise BusquedaInterrumpida()
+
+        # Sin observadores no se mide nada
+        if not self.__observadores:
+            move = self.elegir_movimiento(partida)
+        else:
+            inicio = time.perf_counter()
+            move = self.elegir_movimiento(partida)
+            estadisticas = EstadisticasMovimiento(self, move, time.perf_counter() - inicio)
+            for observador in list(self.__observadores):
+                observador(self, estadisticas)
+
+        # Con la tablebase no hace falta pensar de antemano
+        if self.tiempo_ponderacion is not None and self.origen != ORIGEN_TABLEBASE:
+            self.ponderar(partida, move)
+        return move
+
+    def elegir_movimiento(self, partida: "juego.Tateti"):
+        """Elige el movimiento de la IA y deja en self.origen de donde salio."""
+        self.reiniciar_estadisticas()
+
+        move = self.consultar_libro(partida)
+        if move is not None:
+            self.origen = ORIGEN_LIBRO
+            return move
+
         if partida.tablero().tablero_vacio():
+            self.origen = ORIGEN_ALEATORIO
             move = random.choice(partida.tablero().moves)
         else:
             move = self.best_action(partida)
         return move
 
+    def ponderar(self, partida: "juego.Tateti", move: tuple[int, int]):
+        """Empieza a pensar, en un hilo aparte, las respuestas a los movimientos del rival.
+
+        Se busca sobre la posicion que queda despues de 'move'. Por cada movimiento posible del
+        rival se guarda la mejor respuesta en self.respuestas, y la tabla de transposicion queda
+        cargada para la busqueda del proximo turno.
+        """
+        tablero = tablero_bitboard.TableroBitboard.desde_tablero(partida.tablero())
+        x, y = int(move[0]), int(move[1])
+        tablero.insertar_elemento(x, y, self.ficha())
+        if tablero.check_ganador_desde(x, y, self.ficha(), partida.fichas_seguidas()) or tablero.tablero_lleno():
+            return
+
+        self.respuestas = {}
+        self.ficha_oponente = self.ficha_rival(partida)
+        self.fichas_seguidas = partida.fichas_seguidas()
+        self.preparar_orden(tablero.filas(), tablero.columnas(), self.fichas_seguidas)
+
+        self.cancelacion = threading.Event()
+        self.__ponderacion = threading.Thread(target=self.__ponderar, args=(tablero, time.perf_counter() + self.tiempo_ponderacion), daemon=True)
+        self.__ponderacion.start()
+
+    def __ponderar(self, posicion: "tablero_bitboard.TableroBitboard", limite: float):
+        """Busca las respuestas por rondas de profundidad creciente, empezando por las jugadas del rival mas probables."""
+        ficha_oponente = self.ficha_oponente
+        self.limite_tiempo = limite
+
+        jugadas_rival = []
+        for x, y in self.ordenar_movimientos(posicion.moves, False, 0):
+            hijo = posicion.clone()
+            hijo.insertar_elemento(x, y, ficha_oponente)
+            # Si el rival gana o se llena el tablero no hay nada que responder
+            if not hijo.check_ganador_desde(x, y, ficha_oponente, self.fichas_seguidas) and not hijo.tablero_lleno():
+                jugadas_rival.append(hijo)
+
+        try:
+            for profundidad in range(1, len(posicion.moves)):
+                for hijo in jugadas_rival:
+                    clave = hijo.hash_zobrist()
+                    previa = self.respuestas.get(clave)
+                    if previa is not None and previa[1] >= profundidad:
+                        continue
+
+                    self.tablero = hijo
+                    self.preparar_codigos()
+                    move = self.find_immediate_move() if previa is None else None
+                    if move is not None:
+                        self.respuestas[clave] = (move, float('inf'))
+                        continue
+
+                    move = self.buscar_raiz(profundidad, primero=None if previa is None else previa[0])
+                    # Con tantas jugadas como casilleros vacios la respuesta ya es exacta
+                    self.respuestas[clave] = (move, float('inf') if profundidad >= len(hijo.moves) else profundidad)
+        except BusquedaInterrumpida:
+            pass
+        finally:
+            self.limite_tiempo = None
+
+    def detener_ponderacion(self):
+        """Corta la ponderacion en curso y espera a que termine."""
+        if self.__ponderacion is None:
+            return
+
+        self.cancelacion.set()
+        self.__ponderacion.join()
+        self.__ponderacion = None
+        # La proxima busqueda no hereda la cancelacion de la ponderacion
+        self.cancelacion = threading.Event()
+
+    def cancelar(self):
+        """Pide que se corte la busqueda en curso, se puede llamar desde otro hilo.
+
+        La busqueda termina con BusquedaInterrumpida en los proximos NODOS_POR_CONTROL_DE_TIEMPO nodos.
+        Para cancelar un movimiento que quizas todavia no empezo, se le pasa un evento a colocar_ficha.
+        """
+        self.cancelacion.set()
+
+    def controlar_busqueda(self):
+        """Corta la busqueda si fue cancelada o si se paso self.limite_tiempo."""
+        if self.cancelacion.is_set() or (self.limite_tiempo is not None and time.perf_counter() > self.limite_tiempo):
+            raise BusquedaInterrumpida()
+
+    def suscribir(self, observador):
+        """Agrega un observador que recibe (ia, EstadisticasMovimiento) despues de cada movimiento."""
+        if observador not in self.__observadores:
+            self.__observadores.append(observador)
+        self.medir_estadisticas = True
+
+    def desuscribir(self, observador):
+        if observador in self.__observadores:
+            self.__observadores.remove(observador)
+        self.medir_estadisticas = bool(self.__observadores)
+
+    def reiniciar_estadisticas(self):
+        self.contador = 0
+        self.cortes = 0
+        self.profundidad_maxima = 0
+        self.consultas_transposicion = 0
+        self.aciertos_transposicion = 0
+        self.origen = None
+
+    def ficha_rival(self, partida: "juego.Tateti") -> "Ficha":
+        """Devuelve la ficha del otro participante de la partida."""
+        return partida.jugadores()[1].ficha() if partida.jugadores()[0] == self else partida.jugadores()[0].ficha()
+
+    def consultar_libro(self, partida: "juego.Tateti"):
+        """Busca la posicion actual en el libro de aperturas, si existe uno para este tablero.
+
+        Returns:
+            tuple[int, int] | None: El movimiento del libro, o None si la posicion no esta.
+        """
+        tablero = partida.tablero()
+        libro = libro_aperturas.libro_para(tablero.filas(), tablero.columnas(), partida.fichas_seguidas())
+        if libro is None:
+            return None
+
+        celdas = tablero_bitboard.TableroBitboard.desde_tablero(tablero).celdas([self.ficha(), self.ficha_rival(partida)])
+        return libro.buscar_movimiento(celdas)
+
     def best_action(self, partida: "juego.Tateti"):
-        move_values = []
-        self.tablero = partida.tablero().clone()
+        return self.mejor_movimiento(partida.tablero(), self.ficha_rival(partida), partida.fichas_seguidas())
+
+    def mejor_movimiento(self, tablero: "tablero_tateti.Tablero", ficha_oponente: "Ficha", fichas_seguidas: int, limitar_profundidad: bool = True):
+        """Busca el mejor movimiento para la ficha de la IA en un tablero.
 
-        self.depth_limit = self.calculate_depth_limit(partida.tablero().dimensiones)
+        Args:
+            tablero (Tablero): El tablero de la partida, no se modifica.
+            ficha_oponente (Ficha): La ficha del rival.
+            fichas_seguidas (int): Fichas en linea necesarias para ganar.
+            limitar_profundidad (bool): Si es False se busca hasta el final de la partida.
 
-        inmediate_move = self.find_immediate_move(partida)
+        Returns:
+            tuple[int, int]: Las coordenadas del movimiento.
+        """
+        # La busqueda se hace sobre un tablero de bits para que chequear patrones sea barato
+        self.tablero = tablero_bitboard.TableroBitboard.desde_tablero(tablero)
+
+        self.ficha_oponente = ficha_oponente
+        self.preparar_codigos()
+        self.fichas_seguidas = fichas_seguidas
+        self.limite_tiempo = None
+        self.preparar_orden(tablero.filas(), tablero.columnas(), fichas_seguidas)
+
+        # Respuesta pensada durante el turno del rival
+        respuesta = self.respuestas.get(self.tablero.hash_zobrist())
+        self.respuestas = {}
+        if respuesta is not None:
+            move, profundidad = respuesta
+            # Sirve tal cual si llega tan hondo como la ultima busqueda propia, si no se sigue desde ahi
+            if profundidad == float('inf') or (limitar_profundidad and 0 < self.profundidad_alcanzada <= profundidad):
+                self.origen = ORIGEN_PONDERACION
+                return move
+
+        inmediate_move = self.find_immediate_move()
         if inmediate_move:
+            self.origen = ORIGEN_INMEDIATO
             return inmediate_move
 
+        self.origen = ORIGEN_BUSQUEDA
+
+        if not limitar_profundidad:
+            return self.buscar_raiz(float('inf'))
+
+        if self.tiempo_por_movimiento is not None:
+            # Se sigue desde la profundidad que ya se penso, si hay una respuesta
+            if respuesta is not None:
+                return self.profundizacion_iterativa(self.tiempo_por_movimiento, *respuesta)
+            return self.profundizacion_iterativa(self.tiempo_por_movimiento)
+
+        # En tableros de hasta 3 columnas se busca hasta el final de la partida
+        self.profundidad_alcanzada = self.calculate_depth_limit(tablero.dimensiones) if tablero.columnas() > 3 else float('inf')
+        return self.buscar_raiz(self.profundidad_alcanzada)
+
+    def profundizacion_iterativa(self, segundos: float, primero: tuple[int, int] = None, profundidad_inicial: int = 0):
+        """Busca con limites de profundidad crecientes hasta agotar el tiempo.
+
+        Cada iteracion empieza por el mejor movimiento de la anterior, y se devuelve el
+        resultado de la iteracion mas profunda que llego a terminar.
+
+        Args:
+            segundos (float): Tiempo disponible para el movimiento.
+            primero (tuple[int, int], optional): Mejor movimiento ya conocido, de una busqueda previa.
+            profundidad_inicial (int, optional): Profundidad de la busqueda que encontro 'primero'.
+
+        Raises:
+            BusquedaInterrumpida: Si la busqueda fue cancelada con self.cancelacion.
+
+        Returns:
+            tuple[int, int]: Las coordenadas del movimiento.
+        """
+        limite = time.perf_counter() + segundos
+        best_move = primero
+
+        # Con tantas jugadas como casilleros vacios la busqueda ya llega al final de la partida
+        for profundidad in range(profundidad_inicial + 1, len(self.tablero.moves) + 1):
+            # La primera iteracion siempre termina, para tener algun movimiento
+            self.limite_tiempo = limite if best_move is not None else None
+            try:
+                best_move = self.buscar_raiz(profundidad, primero=best_move)
+                self.profundidad_alcanzada = profundidad
+            except BusquedaInterrumpida:
+                # Si la cancelaron no hay movimiento que devolver
+                if self.cancelacion.is_set():
+                    self.limite_tiempo = None
+                    raise
+                break
+
+            if time.perf_counter() >= limite:
+                break
+
+        self.limite_tiempo = None
+        return best_move
+
+    def buscar_raiz(self, depth_limit: float, primero: tuple[int, int] = None):
+        """Evalua los movimientos de la IA en self.tablero hasta 'depth_limit' jugadas.
+
+        Args:
+            depth_limit (float): Profundidad maxima debajo de cada movimiento.
+            primero (tuple[int, int], optional): Movimiento que se busca antes que el resto.
+
+        Raises:
+            BusquedaInterrumpida: Si se pasa self.limite_tiempo. El tablero queda a medio buscar.
+
+        Returns:
+            tuple[int, int]: El mejor movimiento. Entre movimientos de igual valor se elige el
+            primero en orden de filas, sin importar el orden en que se buscaron.
+        """
+        self.depth_limit = depth_limit
+
+        # Solo se busca un movimiento por cada grupo de movimientos simetricos
+        posiciones_vistas = set()
+        candidatos = []
         for move in self.tablero.moves:
-            x, y = move
-            self.tablero.insertar_elemento(x, y, self.ficha())
+            self.tablero.push(move, self.codigo_propio)
+            posicion = self.tablero.hash_canonico()
+            self.tablero.pop()
+
+            if posicion not in posiciones_vistas:
+                posiciones_vistas.add(posicion)
+                candidatos.append(move)
+
+        orden = {move: indice for indice, move in enumerate(candidatos)}
+        if primero in orden:
+            candidatos.remove(primero)
+            candidatos.insert(0, primero)
+
+        if self.procesos > 1 and len(candidatos) > 1:
+            return self.buscar_raiz_paralelo(candidatos, orden)
+
+        best_move, best_value = None, float('-inf')
+        for move in candidatos:
+            # Ventana apenas por debajo del mejor valor: los empates se siguen valuando exactos
+            alpha = float('-inf') if best_move is None else best_value - EPSILON_EMPATE
+            value = self.valor_movimiento(move, alpha)
 
-            value = self.minmax(partida, False, float('-inf'), float('inf'), 0)
-            move_values.append((move, value))
+            if best_move is None or value > best_value or (value == best_value and orden[move] < orden[best_move]):
+                best_move, best_value = move, value
 
-            self.tablero.vaciar_celda(x, y)
-            
-        best_move = max(move_values, key=lambda mv: mv[1])
+        return best_move
 
-        return best_move[0]
+    def buscar_raiz_paralelo(self, candidatos: list[tuple[int, int]], orden: dict[tuple[int, int], int]):
+        """Reparte los movimientos de la raiz entre self.procesos procesos.
+
+        El primer movimiento se busca en este proceso para tener una cota. El resto se envia
+        a los procesos, y cada uno parte del mejor valor conocido al momento de enviarlo.
+
+        Raises:
+            BusquedaInterrumpida: Si algun movimiento no termino antes de self.limite_tiempo.
+        """
+        best_move = candidatos[0]
+        best_value = self.valor_movimiento(best_move, float('-inf'))
+
+        pool = pool_procesos(self.procesos)
+        posicion = (self.tablero.serializar(), self.ficha().simbolo(), self.ficha_oponente.simbolo(), self.fichas_seguidas, self.depth_limit)
+        pendientes = list(candidatos[1:])
+        en_curso = {}
+
+        try:
+            while pendientes or en_curso:
+                while pendientes and len(en_curso) < self.procesos:
+                    move = pendientes.pop(0)
+                    segundos = None if self.limite_tiempo is None else max(0.0, self.limite_tiempo - time.perf_counter())
+                    futuro = pool.submit(buscar_movimiento_raiz, *posicion, move, best_value - EPSILON_EMPATE, segundos,
+                                           self.medir_estadisticas)
+                    en_curso[futuro] = move
+
+                listos, _ = concurrent.futures.wait(en_curso, timeout=INTERVALO_CONTROL_PARALELO,
+                                                    return_when=concurrent.futures.FIRST_COMPLETED)
+                if self.cancelacion.is_set():
+                    raise BusquedaInterrumpida()
+                for futuro in listos:
+                    move = en_curso.pop(futuro)
+                    value, estadisticas = futuro.result()
+                    self.sumar_estadisticas(estadisticas)
+                    if value is None:
+                        raise BusquedaInterrumpida()
+
+                    if value > best_value or (value == best_value and orden[move] < orden[best_move]):
+                        best_move, best_value = move, value
+        finally:
+            for futuro in en_curso:
+                futuro.cancel()
+
+        return best_move
+
+    def sumar_estadisticas(self, estadisticas: tuple[int, int, int, int, int]):
+        """Suma los contadores de una busqueda hecha en otro proceso (ver buscar_movimiento_raiz)."""
+        nodos, cortes, profundidad, consultas, aciertos = estadisticas
+        self.contador += nodos
+        self.cortes += cortes
+        self.profundidad_maxima = max(self.profundidad_maxima, profundidad)
+        self.consultas_transposicion += consultas
+        self.aciertos_transposicion += aciertos
+
+    def valor_movimiento(self, move: tuple[int, int], alpha: float) -> float:
+        """Valor de un movimiento de la IA en self.tablero, buscado con la ventana (alpha, inf)."""
+        x, y = move
+        self.tablero.push(move, self.codigo_propio)
+        if self.tablero.check_ganador_desde(x, y, self.ficha(), self.fichas_seguidas):
+            value = 1
+        else:
+            value = self.minmax(False, alpha, float('inf'), 0)
+        self.tablero.pop()
+        return value
+
+    def preparar_codigos(self):
+        """Toma los codigos de las fichas en self.tablero, despues de cambiar el tablero o el rival."""
+        self.codigo_propio = self.tablero.codigo(self.ficha())
+        self.codigo_rival = self.tablero.codigo(self.ficha_oponente)
+
+    def preparar_orden(self, filas: int, columnas: int, fichas_seguidas: int):
+        """Prepara el orden estatico del tablero y reinicia las killer moves."""
+        lineas = tablero_bitboard.lineas_por_casillero(filas, columnas, fichas_seguidas)
+        self.orden_estatico = {(indice % columnas + 1, indice // columnas + 1): len(lineas[indice]) for indice in range(filas * columnas)}
+        self.killers = [[] for _ in range(filas * columnas + 1)]
+
+    def ordenar_movimientos(self, moves: list[tuple[int, int]], is_maximizing: bool, depth: int) -> list[tuple[int, int]]:
+        """Ordena los movimientos para que alpha-beta encuentre antes los cortes.
+
+        Primero van las killer moves de la profundidad, despues los de mayor historia y por
+        ultimo los casilleros por los que pasan mas lineas (el centro primero).
+
+        El orden solo cambia cuantos nodos se visitan: con profundidad fija el movimiento elegido
+        es el mismo, porque la raiz desempata por orden de filas (ver buscar_raiz). Con limite de
+        tiempo si puede cambiar, porque con un orden mejor la busqueda llega mas hondo.
+        """
+        killers = self.killers[depth]
+        historia = self.historia[is_maximizing]
+        orden_estatico = self.orden_estatico
+        return sorted(moves, key=lambda move: (move in killers, historia.get(move, 0), orden_estatico[move]), reverse=True)
+
+    def registrar_corte(self, move: tuple[int, int], is_maximizing: bool, depth: int, restantes: int):
+        """Guarda un movimiento que produjo un corte como killer move y en la historia."""
+        killers = self.killers[depth]
+        if move not in killers:
+            killers.insert(0, move)
+            del killers[CANT_KILLERS:]
+
+        historia = self.historia[is_maximizing]
+        historia[move] = historia.get(move, 0) + restantes * restantes
 
     def calculate_depth_limit(self, dimensiones: int) -> int:
         return max(3, 8 - dimensiones)
 
-    def find_immediate_move(self, partida: "juego.Tateti"):
-        ficha_oponente = partida.jugadores()[1].ficha() if partida.jugadores()[0] == self else partida.jugadores()[0].ficha()
-
-        for move in self.tablero.moves:
-            x, y = move
-            self.tablero.insertar_elemento(x, y, self.ficha())
-            if self.tablero.check_patrones(self.ficha(), partida.fichas_seguidas()):
-                self.tablero.vaciar_celda(x, y)
-                return move
-            self.tablero.vaciar_celda(x, y)
+    def find_immediate_move(self):
+        tablero = self.tablero
 
-        for move in self.tablero.moves:
-            x, y = move
-            self.tablero.insertar_elemento(x, y, ficha_oponente)
-            if self.tablero.check_patrones(ficha_oponente, partida.fichas_seguidas()):
-                self.tablero.vaciar_celda(x, y)
-                return move
-            self.tablero.vaciar_celda(x, y)
+        for ficha, codigo in ((self.ficha(), self.codigo_propio), (self.ficha_oponente, self.codigo_rival)):
+            for move in tablero.moves:
+                tablero.push(move, codigo)
+                gana = tablero.check_ganador_desde(move[0], move[1], ficha, self.fichas_seguidas)
+                tablero.pop()
+                if gana:
+                    return move
 
         return None
 
     
-    def minmax(self, partida: "juego.Tateti", is_maximizing: bool, alpha: float, beta: float, depth: int):
-        ficha_oponente = partida.jugadores()[1].ficha() if partida.jugadores()[0] == self else partida.jugadores()[0].ficha()
-
-        if self.tablero.check_patrones(self.ficha(), partida.fichas_seguidas()):
-            return 1
-        elif self.tablero.check_patrones(ficha_oponente, partida.fichas_seguidas()):
-            return -1
-        elif self.tablero.tablero_lleno():
+    def minmax(self, is_maximizing: bool, alpha: float, beta: float, depth: int):
+        tablero = self.tablero
+
+        self.contador += 1
+        if self.contador % NODOS_POR_CONTROL_DE_TIEMPO == 0:
+            self.controlar_busqueda()
+
+        medir = self.medir_estadisticas
+        # Jugadas desde la raiz hasta esta posicion
+        if medir and depth >= self.profundidad_maxima:
+            self.profundidad_maxima = depth + 1
+
+        # Las victorias se detectan al hacer cada movimiento, solo queda el empate
+        if tablero.tablero_lleno():
             return 0
         
-        if depth >= self.depth_limit and (partida.tablero().columnas() > 3 and partida.tablero().filas()):
-            return 0
+        if depth >= self.depth_limit:
+            return self.evaluador.evaluar(tablero, self.ficha(), self.ficha_oponente, self.fichas_seguidas)
+
+        # Se consulta si la posicion ya fue buscada con al menos la misma profundidad
+        profundidad_restante = self.depth_limit - depth
+        clave = tablero.hash_canonico() ^ (transposicion.CLAVE_MAXIMIZA if is_maximizing else 0)
+        entrada = self.transposiciones.buscar(clave)
+        if medir:
+            self.consultas_transposicion += 1
+        if entrada is not None and entrada[1] >= profundidad_restante:
+            if medir:
+                self.aciertos_transposicion += 1
+            valor, _, tipo = entrada
+            if tipo == transposicion.EXACTO:
+                return valor
+            elif tipo == transposicion.COTA_INFERIOR:
+                alpha = max(alpha, valor)
+            else:
+                beta = min(beta, valor)
+
+            if beta <= alpha:
+                return valor
+
+        alpha_inicial, beta_inicial = alpha, beta
+
+        moves = self.ordenar_movimientos(tablero.moves, is_maximizing, depth)
+        restantes = min(profundidad_restante, len(moves))
 
         if is_maximizing:
             best_score = float('-inf')
-            for move in self.tablero.moves:
-                x, y = move
-                self.tablero.insertar_elemento(x, y, self.ficha())
-                value = self.minmax(partida, False, alpha, beta, depth + 1)
+            ficha, codigo = self.ficha(), self.codigo_propio
+            for move in moves:
+                tablero.push(move, codigo)
+                if tablero.check_ganador_desde(move[0], move[1], ficha, self.fichas_seguidas):
+                    value = 1
+                else:
+                    value = self.minmax(False, alpha, beta, depth + 1)
+                tablero.pop()
                 best_score = max(value, best_score)
                 alpha = max(alpha, best_score)
 
                 if beta <= alpha:
-                    self.tablero.vaciar_celda(x, y)
+                    if medir:
+                        self.cortes += 1
+                    self.registrar_corte(move, is_maximizing, depth, restantes)
                     break
-
-                self.tablero.vaciar_celda(x, y)
-            return best_score
         else:
             best_score = float('inf')
-            for move in self.tablero.moves:
-                x, y = move
-                self.tablero.insertar_elemento(x, y, ficha_oponente)
-                value = self.minmax(partida, True, alpha, beta, depth + 1)
+            ficha, codigo = self.ficha_oponente, self.codigo_rival
+            for move in moves:
+                tablero.push(move, codigo)
+                if tablero.check_ganador_desde(move[0], move[1], ficha, self.fichas_seguidas):
+                    value = -1
+                else:
+                    value = self.minmax(True, alpha, beta, depth + 1)
+                tablero.pop()
                 best_score = min(value, best_score)
                 beta = min(beta, best_score)
 
                 if beta <= alpha:
-                    self.tablero.vaciar_celda(x, y)
+                    if medir:
+                        self.cortes += 1
+                    self.registrar_corte(move, is_maximizing, depth, restantes)
                     break
 
-                self.tablero.vaciar_celda(x, y)
-            return best_score
\ No newline at end of file
+        if best_score <= alpha_inicial:
+            tipo = transposicion.COTA_SUPERIOR
+        elif best_score >= beta_inicial:
+            tipo = transposicion.COTA_INFERIOR
+        else:
+            tipo = transposicion.EXACTO
+        self.transposiciones.guardar(clave, best_score, profundidad_restante, tipo)
+
+        return best_score
+
+# Pool compartido por todas las IA del proceso, se crea al primer uso
+_pool = None
+_pool_procesos = 0
+# IA de cada proceso del pool, por configuracion, para que conserven su tabla de transposicion
+_ias_trabajador = {}
+
+def pool_procesos(procesos: int) -> concurrent.futures.ProcessPoolExecutor:
+    """Devuelve el pool de procesos de busqueda, creandolo si no existe o cambio su tamaño."""
+    global _pool, _pool_procesos
+    if _pool is None or _pool_procesos != procesos:
+        if _pool is not None:
+            _pool.shutdown(wait=False, cancel_futures=True)
+        _pool = concurrent.futures.ProcessPoolExecutor(max_workers=procesos)
+        _pool_procesos = procesos
+    return _pool
+
+def ia_trabajador(simbolo: str, simbolo_rival: str, fichas_seguidas: int, filas: int, columnas: int) -> "Minimax_AI":
+    """IA de este proceso del pool para una configuracion, creada al primer uso.
+
+    Se conserva entre busquedas para que reutilice su tabla de transposicion.
+    """
+    clave = (simbolo, simbolo_rival, fichas_seguidas, filas, columnas)
+    ia = _ias_trabajador.get(clave)
+    if ia is None:
+        ia = Minimax_AI()
+        ia.set_ficha(Ficha(simbolo))
+        # El proceso ya es parte de un pool, y entre busquedas no hay a quien esperar
+        ia.procesos = 1
+        ia.tiempo_ponderacion = None
+        ia.preparar_orden(filas, columnas, fichas_seguidas)
+        _ias_trabajador[clave] = ia
+    return ia
+
+def buscar_movimiento_raiz(tablero: tuple, simbolo: str, simbolo_rival: str, fichas_seguidas: int,
+                           depth_limit: float, move: tuple[int, int], alpha: float, segundos: float,
+                           medir_estadisticas: bool = False):
+    """Busca un movimiento de la raiz dentro de un proceso del pool.
+
+    Args:
+        tablero (tuple): El tablero, con TableroBitboard.serializar.
+        simbolo (str): Simbolo de la ficha de la IA.
+        simbolo_rival (str): Simbolo de la ficha del rival.
+        fichas_seguidas (int): Fichas en linea necesarias para ganar.
+        depth_limit (float): Profundidad maxima debajo del movimiento.
+        move (tuple[int, int]): El movimiento a buscar.
+        alpha (float): Cota inferior conocida en la raiz.
+        segundos (float): Tiempo disponible, o None sin limite.
+        medir_estadisticas (bool): Si se cuentan las estadisticas ademas de los nodos.
+
+    Returns:
+        tuple[float, tuple]: El valor (None si se acabo el tiempo) y los contadores de la busqueda:
+        nodos, cortes, profundidad maxima, consultas y aciertos en la tabla de transposicion.
+    """
+    bitboard = tablero_bitboard.TableroBitboard.deserializar(tablero)
+    ia = ia_trabajador(simbolo, simbolo_rival, fichas_seguidas, bitboard.filas(), bitboard.columnas())
+
+    ia.tablero = bitboard
+    ia.ficha_oponente = Ficha(simbolo_rival)
+    ia.preparar_codigos()
+    ia.fichas_seguidas = fichas_seguidas
+    ia.depth_limit = depth_limit
+    ia.limite_tiempo = None if segundos is None else time.perf_counter() + segundos
+    ia.medir_estadisticas = medir_estadisticas
+    ia.reiniciar_estadisticas()
+
+    try:
+        value = ia.valor_movimiento(move, alpha)
+    except BusquedaInterrumpida:
+        value = None
+    return value, (ia.contador, ia.cortes, ia.profundidad_maxima, ia.consultas_transposicion, ia.aciertos_transposicion)
+
+class EstadisticasMovimiento():
+    """Resumen de como la IA eligio un movimiento, se arma solo si hay observadores."""
+    def __init__(self, ia: Minimax_AI, movimiento: tuple[int, int], segundos: float):
+        self.movimiento = movimiento
+        self.segundos = segundos
+        self.origen = ia.origen
+        self.nodos = ia.contador
+        self.cortes = ia.cortes
+        self.profundidad_maxima = ia.profundidad_maxima
+        self.consultas_transposicion = ia.consultas_transposicion
+        self.aciertos_transposicion = ia.aciertos_transposicion
+
+    def inmediato(self) -> bool:
+        """Si find_immediate_move encontro el movimiento sin buscar."""
+        return self.origen == ORIGEN_INMEDIATO
+
+    def tasa_aciertos_transposicion(self) -> float:
+        if not self.consultas_transposicion:
+            return 0.0
+        return self.aciertos_transposicion / self.consultas_transposicion
+
+    def como_dict(self) -> dict:
+        return {
+            "movimiento": self.movimiento,
+            "segundos": self.segundos,
+            "origen": self.origen,
+            "inmediato": self.inmediato(),
+            "nodos": self.nodos,
+            "cortes": self.cortes,
+            "profundidad_maxima": self.profundidad_maxima,
+            "tasa_aciertos_transposicion": self.tasa_aciertos_transposicion()
+        }
+
+    def __repr__(self) -> str:
+        return f'EstadisticasMovimiento({self.como_dict()})'
+
+class BusquedaInterrumpida(Exception):
+    """La busqueda de la IA se corto antes de terminar (por tiempo o cancelacion)."""
+
+class Aleatorio_AI(ParticipanteTateti):
+    """Participante que juega en cualquier casillero libre, sirve de rival de referencia."""
+    def __init__(self):
+        super().__init__()
+        self.set_nombre("Aleatorio")
+
+    def elegir_ficha(self):
+        self.set_ficha(Ficha("?"))
+
+    def colocar_ficha(self, partida: "juego.Tateti"):
+        return random.choice(partida.tablero().moves)
+
+class Tablebase_AI(Minimax_AI):
+    """IA que juega de forma perfecta leyendo cada movimiento de una tablebase precalculada.
+
+    Si no hay tablebase para el tablero de la partida, busca como Minimax_AI.
+    """
+    def __init__(self):
+        super().__init__()
+        self.set_nombre("Tablebase AI")
+
+    def elegir_movimiento(self, partida: "juego.Tateti"):
+        tablero = partida.tablero()
+        tablebase = solucionador.tablebase_para(tablero.filas(), tablero.columnas(), partida.fichas_seguidas())
+        if tablebase is None:
+            return super().elegir_movimiento(partida)
+
+        celdas = tablero_bitboard.TableroBitboard.desde_tablero(tablero).celdas([self.ficha(), self.ficha_rival(partida)])
+
+        # En la tablebase el codigo 1 es de la ficha que empezo la partida
+        if celdas.count(1) < celdas.count(2):
+            celdas = [3 - codigo if codigo else 0 for codigo in celdas]
+
+        casillero = tablebase.jugada(simetrias.rango(celdas))
+        if casillero == solucionador.SIN_JUGADA:
+            return super().elegir_movimiento(partida)
+
+        self.reiniciar_estadisticas()
+        self.origen = ORIGEN_TABLEBASE
+        return casillero % tablero.columnas() + 1, casillero // tablero.columnas() + 1
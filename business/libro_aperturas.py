@@ -0,0 +1,180 @@
+"""Libro de aperturas: el mejor movimiento precalculado para las primeras jugadas.
+
+El libro se construye offline, por ejemplo:
+
+    python -m business.libro_aperturas --filas 3 --columnas 3 --fichas-seguidas 3 --jugadas 4
+
+En tableros de mas de MAX_CASILLEROS_EXACTO casilleros se busca con un limite de tiempo por
+posicion (--segundos), y se guarda el mejor movimiento que se encontro en ese tiempo.
+
+Cada posicion se guarda en su forma canonica (ver business.simetrias), con el codigo 1 para
+la ficha que mueve y 2 para la del rival, junto al indice del casillero donde conviene jugar.
+"""
+
+import argparse
+import struct
+import business.archivo_mapeado as archivo_mapeado
+import business.simetrias as simetrias
+import business.tablero_bitboard as tablero_bitboard
+import business.jugador as jugador
+from settings import (
+    TABLERO_FILAS,
+    TABLERO_COLUMNAS,
+    FICHAS_SEGUIDAS_GANAR,
+    IA_LIBRO_APERTURAS
+)
+
+MAGIA = b'TTLA'
+VERSION = 1
+# magia, version, filas, columnas, fichas seguidas, cantidad de posiciones
+CABECERA = struct.Struct('<4sBBBBI')
+# rango canonico de la posicion, casillero del movimiento
+REGISTRO = struct.Struct('<QH')
+# El rango en base 3 tiene que entrar en 64 bits
+MAX_CASILLEROS = 40
+# Tableros mas grandes no se resuelven hasta el final en un tiempo razonable, se necesita un limite de tiempo
+MAX_CASILLEROS_EXACTO = 16
+
+def ruta_libro(filas: int, columnas: int, fichas_seguidas: int) -> str:
+    """Ruta del libro para una configuracion de tablero, segun settings.IA_LIBRO_APERTURAS."""
+    return archivo_mapeado.ruta_configuracion(IA_LIBRO_APERTURAS, filas, columnas, fichas_seguidas)
+
+class LibroAperturas(archivo_mapeado.ArchivoMapeado):
+    """Libro de aperturas guardado en un archivo binario.
+
+    El archivo se mapea en memoria recien en la primera consulta, y las busquedas son
+    binarias sobre los registros ordenados por rango.
+    """
+    MAGIA = MAGIA
+    VERSION = VERSION
+    CABECERA = CABECERA
+    NOMBRE = "el libro de aperturas"
+
+    def largo_esperado(self, cabecera: tuple) -> int:
+        return CABECERA.size + cabecera[5] * REGISTRO.size
+
+    def __len__(self):
+        return self.cabecera()[5]
+
+    def buscar(self, rango: int):
+        """Devuelve el casillero guardado para un rango canonico, o None si no esta."""
+        datos = self.datos()
+
+        inicio, fin = 0, len(self)
+        while inicio < fin:
+            medio = (inicio + fin) // 2
+            rango_medio, casillero = REGISTRO.unpack_from(datos, CABECERA.size + medio * REGISTRO.size)
+            if rango_medio == rango:
+                return casillero
+            if rango_medio < rango:
+                inicio = medio + 1
+            else:
+                fin = medio
+        return None
+
+    def buscar_movimiento(self, celdas: list[int]):
+        """Busca el movimiento para una posicion.
+
+        Args:
+            celdas (list[int]): Codigo de cada casillero, 1 para la ficha que mueve y 2 para el rival.
+
+        Returns:
+            tuple[int, int] | None: Las coordenadas (x, y) del movimiento, o None si no esta.
+        """
+        filas, columnas, _ = self.dimensiones()
+        rango, simetria = simetrias.forma_canonica(celdas, filas, columnas)
+
+        casillero = self.buscar(rango)
+        if casillero is None:
+            return None
+
+        move = (casillero % columnas + 1, casillero // columnas + 1)
+        return simetrias.restaurar_movimiento(move, simetria, filas, columnas)
+
+# Libros abiertos por configuracion
+_libros = archivo_mapeado.ArchivosPorConfiguracion(IA_LIBRO_APERTURAS, LibroAperturas)
+
+def libro_para(filas: int, columnas: int, fichas_seguidas: int):
+    """Devuelve el libro de una configuracion de tablero, o None si no fue construido."""
+    return _libros.obtener(filas, columnas, fichas_seguidas)
+
+def construir_libro(filas: int, columnas: int, fichas_seguidas: int, jugadas: int, ruta: str, segundos: float = None) -> int:
+    """Resuelve las primeras jugadas de una configuracion y guarda el libro en 'ruta'.
+
+    Args:
+        filas (int): Filas del tablero.
+        columnas (int): Columnas del tablero.
+        fichas_seguidas (int): Fichas en linea necesarias para ganar.
+        jugadas (int): Cantidad de jugadas desde el tablero vacio que cubre el libro.
+        ruta (str): Archivo de salida.
+        segundos (float): Tiempo de busqueda por posicion, None busca hasta el final de la partida.
+
+    Returns:
+        int: La cantidad de posiciones guardadas.
+    """
+    if filas * columnas > MAX_CASILLEROS:
+        raise ValueError(f'El libro admite tableros de hasta {MAX_CASILLEROS} casilleros.')
+    if segundos is None and filas * columnas > MAX_CASILLEROS_EXACTO:
+        raise ValueError(f'Los tableros de mas de {MAX_CASILLEROS_EXACTO} casilleros necesitan un limite de tiempo por posicion.')
+
+    fichas = [jugador.Ficha("A"), jugador.Ficha("B")]
+    # Una IA por ficha, asi cada una conserva su tabla de transposicion
+    ias = []
+    for ficha in fichas:
+        ia = jugador.Minimax_AI()
+        ia.set_ficha(ficha)
+        ia.tiempo_por_movimiento = segundos
+        ias.append(ia)
+
+    libro = {}
+    frontera = [tablero_bitboard.TableroBitboard(filas, columnas)]
+
+    for jugada in range(jugadas):
+        propia, rival = fichas[jugada % 2], fichas[(jugada + 1) % 2]
+        siguiente = {}
+
+        for tablero in frontera:
+            rango, simetria = simetrias.forma_canonica(tablero.celdas([propia, rival]), filas, columnas)
+            if rango not in libro:
+                move = ias[jugada % 2].mejor_movimiento(tablero, rival, fichas_seguidas, limitar_profundidad=segundos is not None)
+                x, y = simetrias.transformar_movimiento(move, simetria, filas, columnas)
+                libro[rango] = (y - 1) * columnas + (x - 1)
+
+            # Se expanden las posiciones que no terminan la partida
+            for x, y in tablero.moves:
+                hijo = tablero.clone()
+                hijo.insertar_elemento(x, y, propia)
+                if hijo.check_ganador_desde(x, y, propia, fichas_seguidas) or hijo.tablero_lleno():
+                    continue
+                siguiente.setdefault(hijo.hash_canonico(), hijo)
+
+        frontera = list(siguiente.values())
+
+    archivo_mapeado.preparar_directorio(ruta)
+    with open(ruta, 'wb') as archivo:
+        archivo.write(CABECERA.pack(MAGIA, VERSION, filas, columnas, fichas_seguidas, len(libro)))
+        for rango in sorted(libro):
+            archivo.write(REGISTRO.pack(rango, libro[rango]))
+
+    # Si el libro ya estaba abierto se vuelve a buscar en la proxima consulta
+    _libros.olvidar(filas, columnas, fichas_seguidas)
+
+    return len(libro)
+
+def main(argumentos=None):
+    parser = argparse.ArgumentParser(description="Construye el libro de aperturas de la IA.")
+    parser.add_argument("--filas", type=int, default=TABLERO_FILAS)
+    parser.add_argument("--columnas", type=int, default=TABLERO_COLUMNAS)
+    parser.add_argument("--fichas-seguidas", type=int, default=FICHAS_SEGUIDAS_GANAR)
+    parser.add_argument("--jugadas", type=int, default=3, help="Jugadas desde el tablero vacio que cubre el libro.")
+    parser.add_argument("--salida", default=None, help="Archivo de salida (por defecto settings.IA_LIBRO_APERTURAS).")
+    parser.add_argument("--segundos", type=float, default=None,
+                        help=f'Tiempo de busqueda por posicion, obligatorio con mas de {MAX_CASILLEROS_EXACTO} casilleros (por defecto se busca hasta el final).')
+    opciones = parser.parse_args(argumentos)
+
+    ruta = opciones.salida or ruta_libro(opciones.filas, opciones.columnas, opciones.fichas_seguidas)
+    cantidad = construir_libro(opciones.filas, opciones.columnas, opciones.fichas_seguidas, opciones.jugadas, ruta, opciones.segundos)
+    print(f'{cantidad} posiciones guardadas en {ruta}')
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,128 @@
+"""Deteccion de ganadores para muchos tableros a la vez, con numpy.
+
+Los tableros se pasan como un arreglo (N, filas, columnas) de enteros chicos, con 0 en los
+casilleros vacios y el codigo de cada ficha en los ocupados (como TableroTateti.celdas).
+Cada direccion se revisa con ventanas deslizantes de 'fichas_seguidas' casilleros sobre todo
+el lote, sin recorrer los tableros uno por uno.
+"""
+
+import numpy as np
+import business.tablero_tateti as tablero_tateti
+
+# Tableros que se procesan juntos, para no crear temporales de varios GB
+TAMANO_BLOQUE = 1 << 18
+# Codigo temporal de las fichas que no estan en 'fichas', ver desde_tableros
+_DESCONOCIDA = 0xFF
+
+def desde_tableros(tableros: list["tablero_tateti.TableroTateti"], fichas: list) -> np.ndarray:
+    """Arma el arreglo de un lote de tableros de las mismas dimensiones.
+
+    Args:
+        tableros (list[TableroTateti]): Los tableros a convertir.
+        fichas (list[Ficha]): Orden de las fichas, la primera tiene el codigo 1, la segunda el 2, etc.
+
+    Returns:
+        np.ndarray: Arreglo int8 de forma (N, filas, columnas).
+
+    Raises:
+        ValueError: Si los tableros tienen distintas dimensiones o alguno tiene una ficha que no esta en 'fichas'.
+    """
+    if not tableros:
+        raise ValueError("El lote no tiene tableros.")
+
+    filas, columnas = tableros[0].filas(), tableros[0].columnas()
+    codigos = {ficha: codigo for codigo, ficha in enumerate(fichas, 1)}
+
+    datos = bytearray()
+    for tablero in tableros:
+        if tablero.filas() != filas or tablero.columnas() != columnas:
+            raise ValueError("Todos los tableros del lote deben tener las mismas dimensiones.")
+
+        # Cada tablero asigna sus propios codigos, se traducen al orden de 'fichas'
+        fichas_tablero = tablero.fichas()
+        tabla = bytes(codigos.get(ficha, _DESCONOCIDA) if ficha is not None else 0 for ficha in fichas_tablero)
+        celdas = tablero.celdas().translate(tabla.ljust(256, b'\0'))
+
+        desconocida = celdas.find(_DESCONOCIDA)
+        if desconocida != -1:
+            raise ValueError(f'El tablero tiene una ficha que no esta en el lote ({fichas_tablero[tablero.celdas()[desconocida]]})')
+        datos += celdas
+
+    return np.frombuffer(bytes(datos), dtype=np.int8).reshape(len(tableros), filas, columnas)
+
+def _ventanas(ocupados: np.ndarray, fichas_seguidas: int) -> np.ndarray:
+    """Si cada tablero tiene 'fichas_seguidas' casilleros marcados en linea en alguna direccion."""
+    _, filas, columnas = ocupados.shape
+    k = fichas_seguidas
+    resultado = np.zeros(len(ocupados), dtype=bool)
+
+    # Horizontales
+    if k <= columnas:
+        linea = np.logical_and.reduce([ocupados[:, :, i:columnas - k + 1 + i] for i in range(k)])
+        resultado |= linea.any(axis=(1, 2))
+
+    # Verticales
+    if k <= filas:
+        linea = np.logical_and.reduce([ocupados[:, i:filas - k + 1 + i, :] for i in range(k)])
+        resultado |= linea.any(axis=(1, 2))
+
+    if k <= filas and k <= columnas:
+        # Izquierda - Derecha
+        linea = np.logical_and.reduce([ocupados[:, i:filas - k + 1 + i, i:columnas - k + 1 + i] for i in range(k)])
+        resultado |= linea.any(axis=(1, 2))
+
+        # Derecha - Izquierda
+        linea = np.logical_and.reduce([ocupados[:, k - 1 - i:filas - i, i:columnas - k + 1 + i] for i in range(k)])
+        resultado |= linea.any(axis=(1, 2))
+
+    return resultado
+
+def hay_patron(tableros: np.ndarray, codigo: int, fichas_seguidas: int) -> np.ndarray:
+    """Equivalente a TableroTateti.check_patrones para la ficha 'codigo' en cada tablero del lote.
+
+    Returns:
+        np.ndarray: Arreglo bool de largo N.
+    """
+    tableros = _validar(tableros, fichas_seguidas)
+
+    resultado = np.empty(len(tableros), dtype=bool)
+    for inicio in range(0, len(tableros), TAMANO_BLOQUE):
+        bloque = tableros[inicio:inicio + TAMANO_BLOQUE]
+        resultado[inicio:inicio + TAMANO_BLOQUE] = _ventanas(bloque == codigo, fichas_seguidas)
+    return resultado
+
+def ganadores(tableros: np.ndarray, fichas_seguidas: int) -> np.ndarray:
+    """Codigo de la ficha ganadora de cada tablero del lote, 0 si nadie gano.
+
+    Si en un tablero mas de una ficha forma linea (no pasa en partidas reales) se devuelve
+    el codigo mas chico.
+
+    Returns:
+        np.ndarray: Arreglo int8 de largo N.
+    """
+    tableros = _validar(tableros, fichas_seguidas)
+
+    resultado = np.zeros(len(tableros), dtype=np.int8)
+    for inicio in range(0, len(tableros), TAMANO_BLOQUE):
+        bloque = tableros[inicio:inicio + TAMANO_BLOQUE]
+        parcial = resultado[inicio:inicio + TAMANO_BLOQUE]
+        # Los codigos se recorren de mayor a menor para que quede el mas chico
+        for codigo in np.unique(bloque)[::-1]:
+            if codigo > 0:
+                parcial[_ventanas(bloque == codigo, fichas_seguidas)] = codigo
+    return resultado
+
+def empates(tableros: np.ndarray, fichas_seguidas: int, ganadores_lote: np.ndarray = None) -> np.ndarray:
+    """Tableros llenos sin ganador. Se pueden pasar los ganadores ya calculados del lote."""
+    if ganadores_lote is None:
+        ganadores_lote = ganadores(tableros, fichas_seguidas)
+    tableros = np.asarray(tableros)
+    return (ganadores_lote == 0) & (tableros != 0).all(axis=(1, 2))
+
+def _validar(tableros, fichas_seguidas: int) -> np.ndarray:
+    tableros = np.asarray(tableros)
+    if tableros.ndim != 3:
+        raise ValueError("El lote debe tener forma (N, filas, columnas).")
+    if not isinstance(fichas_seguidas, int) or fichas_seguidas < 1:
+        raise ValueError("Las fichas seguidas deben ser un entero positivo.")
+    return tableros
@@ -0,0 +1,370 @@
+"""Servidor de partidas de Ta-Te-Ti contra la IA, con muchas sesiones en un mismo proceso.
+
+Protocolo: una linea JSON por pedido y una por respuesta, sobre TCP.
+
+    {"accion": "nueva", "filas": 3, "columnas": 3, "fichas_seguidas": 3, "empieza": "ia"}
+    {"accion": "mover", "sesion": "...", "x": 2, "y": 2}
+    {"accion": "estado", "sesion": "..."}
+    {"accion": "cerrar", "sesion": "..."}
+
+Todas las respuestas tienen "ok"; si es false, "error" explica el motivo. Las busquedas de la
+IA se hacen en un pool de procesos compartido por todas las sesiones, y los movimientos ya
+calculados se guardan en un cache por posicion canonica.
+
+    python -m business.servidor --puerto 8765
+"""
+
+import argparse
+import asyncio
+import concurrent.futures
+import json
+import random
+import time
+import uuid
+from collections import OrderedDict
+import business.tablero_tateti as tablero_tateti
+import business.estado as estado
+import business.tablero_bitboard as tablero_bitboard
+import business.simetrias as simetrias
+import business.jugador as jugador
+from settings import (
+    TABLERO_FILAS,
+    TABLERO_COLUMNAS,
+    FICHAS_SEGUIDAS_GANAR,
+    FICHAS_DEFAULT,
+    IA_TIEMPO_POR_MOVIMIENTO,
+    SERVIDOR_HOST,
+    SERVIDOR_PUERTO,
+    SERVIDOR_PROCESOS,
+    SERVIDOR_MAX_SESIONES,
+    SERVIDOR_MAX_BUSQUEDAS,
+    SERVIDOR_TIMEOUT_SESION,
+    SERVIDOR_MAX_CACHE
+)
+
+# Casilleros del tablero mas grande que se acepta
+MAX_CASILLEROS = 64
+# Largo maximo de una linea del protocolo
+MAX_LARGO_PEDIDO = 4096
+# Margen sobre IA_TIEMPO_POR_MOVIMIENTO antes de dar por perdida una busqueda
+MARGEN_BUSQUEDA = 5.0
+
+class ErrorPedido(Exception):
+    """Pedido invalido o que no se puede atender, el mensaje se devuelve al cliente."""
+
+def calcular_movimiento(tablero: tuple, simbolo: str, simbolo_rival: str, fichas_seguidas: int) -> tuple[int, int]:
+    """Busca el movimiento de la IA dentro de un proceso del pool.
+
+    Args:
+        tablero (tuple): El tablero, con TableroBitboard.serializar.
+        simbolo (str): Simbolo de la ficha de la IA.
+        simbolo_rival (str): Simbolo de la ficha del rival.
+        fichas_seguidas (int): Fichas en linea necesarias para ganar.
+    """
+    bitboard = tablero_bitboard.TableroBitboard.deserializar(tablero)
+    ia = jugador.ia_trabajador(simbolo, simbolo_rival, fichas_seguidas, bitboard.filas(), bitboard.columnas())
+    return ia.mejor_movimiento(bitboard, jugador.Ficha(simbolo_rival), fichas_seguidas)
+
+class Sesion():
+    """Una partida de un cliente contra la IA."""
+
+    def __init__(self, filas: int, columnas: int, fichas_seguidas: int, empieza_ia: bool):
+        self.__id = uuid.uuid4().hex
+        # El que empieza juega con la primera ficha predeterminada
+        fichas = [jugador.Ficha(simbolo) for simbolo in FICHAS_DEFAULT[:2]]
+        self.__ficha_ia, self.__ficha_humano = fichas if empieza_ia else fichas[::-1]
+        self.__partida = estado.EstadoTateti(filas, columnas, fichas_seguidas, fichas)
+        self.__ultimo_uso = time.monotonic()
+        # Los pedidos de una misma sesion se atienden de a uno
+        self.bloqueo = asyncio.Lock()
+
+    # Getters
+    def id(self):
+        return self.__id
+
+    def partida(self):
+        return self.__partida
+
+    def tablero(self):
+        return self.__partida.tablero()
+
+    def fichas_seguidas(self):
+        return self.__partida.fichas_seguidas()
+
+    def ficha_ia(self):
+        return self.__ficha_ia
+
+    def ficha_humano(self):
+        return self.__ficha_humano
+
+    def estado(self):
+        return self.__partida.status()
+
+    def ultimo_uso(self):
+        return self.__ultimo_uso
+
+    def tocar(self):
+        self.__ultimo_uso = time.monotonic()
+
+    def jugar(self, x: int, y: int):
+        """Pone la ficha del jugador del turno."""
+        try:
+            self.__partida = self.__partida.apply_move(x, y)
+        except (TypeError, ValueError):
+            raise ErrorPedido(f'Coordenadas inválidas ({x}, {y})')
+        except (tablero_tateti.OcupadoError, estado.PartidaTerminadaError) as Error:
+            raise ErrorPedido(str(Error))
+
+    def restaurar(self, partida: "estado.EstadoTateti"):
+        """Vuelve a un estado anterior de la partida."""
+        self.__partida = partida
+
+    def como_dict(self) -> dict:
+        return {
+            "sesion": self.__id,
+            "tablero": [[None if ficha is None else ficha.simbolo() for ficha in fila] for fila in self.tablero().tablero()],
+            "ficha_ia": self.__ficha_ia.simbolo(),
+            "ficha_humano": self.__ficha_humano.simbolo(),
+            "estado": self.__partida.status(),
+            "ganador": None if self.__partida.ganador() is None else self.__partida.ganador().simbolo()
+        }
+
+class ServidorTateti():
+    """Servidor asyncio que aloja las sesiones y reparte las busquedas de la IA."""
+
+    def __init__(self, procesos: int = SERVIDOR_PROCESOS, max_sesiones: int = SERVIDOR_MAX_SESIONES,
+                 max_busquedas: int = SERVIDOR_MAX_BUSQUEDAS, timeout_sesion: float = SERVIDOR_TIMEOUT_SESION,
+                 max_cache: int = SERVIDOR_MAX_CACHE):
+        self.__procesos = procesos
+        self.__max_sesiones = max_sesiones
+        self.__timeout_sesion = timeout_sesion
+        self.__max_cache = max_cache
+        self.__sesiones: dict[str, Sesion] = {}
+        # Movimiento de la IA por posicion canonica, (filas, columnas, fichas seguidas, rango) -> casillero
+        self.__cache: OrderedDict[tuple, int] = OrderedDict()
+        # Busquedas que pueden estar en el pool o esperando lugar; el resto se rechaza
+        self.__busquedas = asyncio.Semaphore(max_busquedas)
+        self.__pool: concurrent.futures.ProcessPoolExecutor = None
+        self.__servidor: asyncio.AbstractServer = None
+        self.__limpieza: asyncio.Task = None
+        self.__conexiones: dict[asyncio.Task, asyncio.StreamWriter] = {}
+
+    def sesiones(self):
+        return self.__sesiones
+
+    def cache(self):
+        return self.__cache
+
+    async def iniciar(self, host: str = SERVIDOR_HOST, puerto: int = SERVIDOR_PUERTO):
+        self.__pool = concurrent.futures.ProcessPoolExecutor(max_workers=self.__procesos)
+        self.__servidor = await asyncio.start_server(self.__atender_conexion, host, puerto, limit=MAX_LARGO_PEDIDO)
+        self.__limpieza = asyncio.create_task(self.__limpiar_sesiones())
+        return self.__servidor
+
+    async def cerrar(self):
+        if self.__limpieza is not None:
+            self.__limpieza.cancel()
+        if self.__servidor is not None:
+            self.__servidor.close()
+            # Al cerrar las conexiones abiertas sus lecturas terminan y los pedidos en curso se descartan
+            for escritor in self.__conexiones.values():
+                escritor.close()
+            await asyncio.gather(*self.__conexiones, return_exceptions=True)
+            await self.__servidor.wait_closed()
+        if self.__pool is not None:
+            self.__pool.shutdown(wait=False, cancel_futures=True)
+
+    async def __limpiar_sesiones(self):
+        """Descarta las sesiones que pasaron mas de timeout_sesion segundos sin pedidos."""
+        while True:
+            await asyncio.sleep(self.__timeout_sesion / 4)
+            limite = time.monotonic() - self.__timeout_sesion
+            for id_sesion in [id_sesion for id_sesion, sesion in self.__sesiones.items() if sesion.ultimo_uso() < limite]:
+                del self.__sesiones[id_sesion]
+
+    async def __atender_conexion(self, lector: asyncio.StreamReader, escritor: asyncio.StreamWriter):
+        """Atiende los pedidos de una conexion de a uno, asi un cliente no puede acumular trabajo."""
+        self.__conexiones[asyncio.current_task()] = escritor
+        try:
+            while True:
+                try:
+                    linea = await asyncio.wait_for(lector.readline(), self.__timeout_sesion)
+                except (asyncio.TimeoutError, ValueError, ConnectionError):
+                    # Conexion inactiva o linea demasiado larga
+                    break
+                if not linea:
+                    break
+
+                respuesta = await self.atender(linea)
+                escritor.write(json.dumps(respuesta).encode() + b"\n")
+                # Si el cliente no lee, se espera en lugar de acumular respuestas
+                await escritor.drain()
+        except ConnectionError:
+            pass
+        finally:
+            self.__conexiones.pop(asyncio.current_task(), None)
+            escritor.close()
+
+    async def atender(self, linea: bytes) -> dict:
+        """Procesa una linea del protocolo y devuelve la respuesta."""
+        try:
+            try:
+                pedido = json.loads(linea)
+            except ValueError:
+                raise ErrorPedido("El pedido no es JSON valido")
+            if not isinstance(pedido, dict):
+                raise ErrorPedido("El pedido debe ser un objeto JSON")
+
+            acciones = {"nueva": self.__nueva, "mover": self.__mover, "estado": self.__estado, "cerrar": self.__cerrar}
+            accion = acciones.get(pedido.get("accion"))
+            if accion is None:
+                raise ErrorPedido(f'Accion desconocida ({pedido.get("accion")}), opciones: {", ".join(acciones)}')
+
+            respuesta = await accion(pedido)
+            respuesta["ok"] = True
+            return respuesta
+        except ErrorPedido as Error:
+            return {"ok": False, "error": str(Error)}
+
+    def __sesion(self, pedido: dict) -> Sesion:
+        sesion = self.__sesiones.get(pedido.get("sesion"))
+        if sesion is None:
+            raise ErrorPedido("Sesion inexistente o vencida")
+        sesion.tocar()
+        return sesion
+
+    async def __nueva(self, pedido: dict) -> dict:
+        if len(self.__sesiones) >= self.__max_sesiones:
+            raise ErrorPedido("No hay lugar para mas sesiones")
+
+        filas = pedido.get("filas", TABLERO_FILAS)
+        columnas = pedido.get("columnas", TABLERO_COLUMNAS)
+        fichas_seguidas = pedido.get("fichas_seguidas", FICHAS_SEGUIDAS_GANAR)
+        for valor in (filas, columnas, fichas_seguidas):
+            if not isinstance(valor, int) or isinstance(valor, bool) or valor < 1:
+                raise ErrorPedido("Las dimensiones y las fichas seguidas deben ser enteros positivos")
+        if filas * columnas > MAX_CASILLEROS:
+            raise ErrorPedido(f'El tablero admite hasta {MAX_CASILLEROS} casilleros')
+
+        sesion = Sesion(filas, columnas, fichas_seguidas, pedido.get("empieza") == "ia")
+        self.__sesiones[sesion.id()] = sesion
+
+        respuesta = {}
+        if pedido.get("empieza") == "ia":
+            async with sesion.bloqueo:
+                respuesta["movimiento_ia"] = await self.__jugar_ia(sesion)
+        respuesta.update(sesion.como_dict())
+        return respuesta
+
+    async def __mover(self, pedido: dict) -> dict:
+        sesion = self.__sesion(pedido)
+        x, y = pedido.get("x"), pedido.get("y")
+        if any(not isinstance(valor, int) or isinstance(valor, bool) for valor in (x, y)):
+            raise ErrorPedido("Las coordenadas deben ser numeros enteros")
+
+        respuesta = {}
+        async with sesion.bloqueo:
+            if sesion.estado() == estado.JUGANDO and sesion.partida().next_player() is not sesion.ficha_humano():
+                raise ErrorPedido("No es el turno del jugador")
+            anterior = sesion.partida()
+            sesion.jugar(x, y)
+            if sesion.estado() == estado.JUGANDO:
+                try:
+                    respuesta["movimiento_ia"] = await self.__jugar_ia(sesion)
+                except BaseException:
+                    # El pedido se rechaza entero (incluso si se corta la conexion), asi el cliente lo puede repetir
+                    sesion.restaurar(anterior)
+                    raise
+        respuesta.update(sesion.como_dict())
+        return respuesta
+
+    async def __estado(self, pedido: dict) -> dict:
+        return self.__sesion(pedido).como_dict()
+
+    async def __cerrar(self, pedido: dict) -> dict:
+        sesion = self.__sesion(pedido)
+        del self.__sesiones[sesion.id()]
+        return {"sesion": sesion.id()}
+
+    async def __jugar_ia(self, sesion: Sesion) -> tuple[int, int]:
+        move = await self.movimiento_ia(sesion)
+        sesion.jugar(move[0], move[1])
+        sesion.tocar()
+        return move
+
+    def __fin_busqueda(self, futuro: asyncio.Future):
+        """Libera el lugar de una busqueda cuando termina en el pool, aunque ya nadie la espere."""
+        self.__busquedas.release()
+        # El resultado de una busqueda abandonada se descarta, incluso si fallo
+        if not futuro.cancelled():
+            futuro.exception()
+
+    async def movimiento_ia(self, sesion: Sesion) -> tuple[int, int]:
+        """Movimiento de la IA en una sesion, del cache o buscado en el pool."""
+        tablero = sesion.tablero()
+        filas, columnas = tablero.filas(), tablero.columnas()
+        if tablero.tablero_vacio():
+            return random.choice(tablero.moves)
+
+        bitboard = tablero_bitboard.TableroBitboard.desde_tablero(tablero)
+        rango, simetria = simetrias.forma_canonica(bitboard.celdas([sesion.ficha_ia(), sesion.ficha_humano()]), filas, columnas)
+        clave = (filas, columnas, sesion.fichas_seguidas(), rango)
+
+        casillero = self.__cache.get(clave)
+        if casillero is not None:
+            self.__cache.move_to_end(clave)
+            return simetrias.restaurar_movimiento((casillero % columnas + 1, casillero // columnas + 1), simetria, filas, columnas)
+
+        # Si hay demasiadas busquedas pendientes se rechaza el pedido en lugar de encolarlo
+        if self.__busquedas.locked():
+            raise ErrorPedido("El servidor esta ocupado, intente de nuevo")
+
+        espera = MARGEN_BUSQUEDA + (IA_TIEMPO_POR_MOVIMIENTO or 0)
+        await self.__busquedas.acquire()
+        try:
+            futuro = asyncio.get_running_loop().run_in_executor(
+                self.__pool, calcular_movimiento, bitboard.serializar(),
+                sesion.ficha_ia().simbolo(), sesion.ficha_humano().simbolo(), sesion.fichas_seguidas())
+        except Exception:
+            # El pool no acepto la busqueda (por ejemplo si se rompio)
+            self.__busquedas.release()
+            raise ErrorPedido("La IA fallo, intente de nuevo")
+        futuro.add_done_callback(self.__fin_busqueda)
+        try:
+            # shield: si se deja de esperar, la busqueda sigue en el pool y conserva su lugar
+            move = await asyncio.wait_for(asyncio.shield(futuro), espera)
+        except asyncio.TimeoutError:
+            raise ErrorPedido("La IA no encontro un movimiento a tiempo")
+        except Exception:
+            # Fallo el proceso o la busqueda, el error no le sirve al cliente
+            raise ErrorPedido("La IA fallo, intente de nuevo")
+
+        x, y = simetrias.transformar_movimiento(move, simetria, filas, columnas)
+        self.__cache[clave] = (y - 1) * columnas + (x - 1)
+        if len(self.__cache) > self.__max_cache:
+            self.__cache.popitem(last=False)
+        return move
+
+async def servir(host: str, puerto: int, procesos: int):
+    servidor = ServidorTateti(procesos=procesos)
+    conexiones = await servidor.iniciar(host, puerto)
+    print(f'Servidor de Ta-Te-Ti en {", ".join(str(socket.getsockname()) for socket in conexiones.sockets)}')
+    try:
+        await conexiones.serve_forever()
+    finally:
+        await servidor.cerrar()
+
+def main(argumentos=None):
+    parser = argparse.ArgumentParser(description="Servidor de partidas de Ta-Te-Ti contra la IA.")
+    parser.add_argument("--host", default=SERVIDOR_HOST)
+    parser.add_argument("--puerto", type=int, default=SERVIDOR_PUERTO)
+    parser.add_argument("--procesos", type=int, default=SERVIDOR_PROCESOS, help="Procesos del pool de la IA.")
+    opciones = parser.parse_args(argumentos)
+
+    try:
+        asyncio.run(servir(opciones.host, opciones.puerto, opciones.procesos))
+    except KeyboardInterrupt:
+        pass
+
+if __name__ == "__main__":
+    main()
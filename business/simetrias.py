@@ -0,0 +1,89 @@
+"""Simetrias del tablero de Ta-Te-Ti y forma canonica de las posiciones.
+
+Un tablero cuadrado tiene 8 simetrias (rotaciones y espejos) y uno rectangular 4.
+Los casilleros se indexan como y * columnas + x, con x e y empezando en 0.
+"""
+
+from functools import lru_cache
+
+@lru_cache(maxsize=None)
+def permutaciones(filas: int, columnas: int) -> tuple[tuple[int, ...], ...]:
+    """Permutaciones de casilleros de cada simetria del tablero. La primera es la identidad.
+
+    Returns:
+        tuple[tuple[int, ...], ...]: Para cada simetria, el indice destino de cada casillero.
+    """
+    transformaciones = [
+        lambda x, y: (x, y),
+        lambda x, y: (columnas - 1 - x, y),
+        lambda x, y: (x, filas - 1 - y),
+        lambda x, y: (columnas - 1 - x, filas - 1 - y),
+    ]
+    if filas == columnas:
+        transformaciones += [
+            lambda x, y: (y, x),
+            lambda x, y: (filas - 1 - y, x),
+            lambda x, y: (y, columnas - 1 - x),
+            lambda x, y: (filas - 1 - y, columnas - 1 - x),
+        ]
+
+    resultado = []
+    for transformar in transformaciones:
+        permutacion = []
+        for indice in range(filas * columnas):
+            x, y = transformar(indice % columnas, indice // columnas)
+            permutacion.append(y * columnas + x)
+        resultado.append(tuple(permutacion))
+    return tuple(resultado)
+
+@lru_cache(maxsize=None)
+def inversas(filas: int, columnas: int) -> tuple[tuple[int, ...], ...]:
+    """Permutaciones que deshacen cada simetria de 'permutaciones'."""
+    resultado = []
+    for permutacion in permutaciones(filas, columnas):
+        inversa = [0] * len(permutacion)
+        for origen, destino in enumerate(permutacion):
+            inversa[destino] = origen
+        resultado.append(tuple(inversa))
+    return tuple(resultado)
+
+def rango(celdas) -> int:
+    """Numero en base 3 de una posicion, con un codigo 0 (vacio), 1 o 2 por casillero.
+
+    El casillero 0 es el digito menos significativo.
+    """
+    resultado = 0
+    for codigo in reversed(celdas):
+        resultado = resultado * 3 + codigo
+    return resultado
+
+def forma_canonica(celdas, filas: int, columnas: int) -> tuple[int, int]:
+    """Busca la simetria que lleva la posicion a su menor rango.
+
+    Args:
+        celdas: Codigo 0, 1 o 2 de cada casillero.
+        filas (int): Filas del tablero.
+        columnas (int): Columnas del tablero.
+
+    Returns:
+        tuple[int, int]: El rango canonico y el indice de la simetria que lo produce.
+    """
+    mejor = None
+    for simetria, permutacion in enumerate(inversas(filas, columnas)):
+        transformada = [celdas[origen] for origen in permutacion]
+        valor = rango(transformada)
+        if mejor is None or valor < mejor[0]:
+            mejor = (valor, simetria)
+    return mejor
+
+def transformar_movimiento(move: tuple[int, int], simetria: int, filas: int, columnas: int) -> tuple[int, int]:
+    """Lleva un movimiento (x, y), con coordenadas desde 1, a la posicion transformada."""
+    x, y = move
+    destino = permutaciones(filas, columnas)[simetria][(y - 1) * columnas + (x - 1)]
+    return destino % columnas + 1, destino // columnas + 1
+
+def restaurar_movimiento(move: tuple[int, int], simetria: int, filas: int, columnas: int) -> tuple[int, int]:
+    """Lleva un movimiento de la posicion transformada a la posicion original."""
+    x, y = move
+    origen = inversas(filas, columnas)[simetria][(y - 1) * columnas + (x - 1)]
+    return origen % columnas + 1, origen // columnas + 1
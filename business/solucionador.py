@@ -0,0 +1,189 @@
+"""Solucionador retrogrado y tabla de finales (tablebase) para tableros chicos.
+
+Se enumeran todas las posiciones alcanzables desde el tablero vacio y se resuelven desde
+la ultima jugada hacia la primera. Cada posicion se indexa por su rango en base 3, con el
+codigo 1 para la ficha que empieza la partida y 2 para la otra:
+
+    python -m business.solucionador --filas 4 --columnas 4 --fichas-seguidas 3
+
+El archivo guarda tres arreglos densos de 3 ** casilleros bytes: el valor de la posicion
+para la ficha que mueve, la cantidad de jugadas hasta el final y el mejor casillero.
+"""
+
+import argparse
+import struct
+from array import array
+import business.archivo_mapeado as archivo_mapeado
+import business.tablero_bitboard as tablero_bitboard
+from settings import (
+    TABLERO_FILAS,
+    TABLERO_COLUMNAS,
+    FICHAS_SEGUIDAS_GANAR,
+    IA_TABLEBASE
+)
+
+MAGIA = b'TTTB'
+VERSION = 1
+# magia, version, filas, columnas, fichas seguidas
+CABECERA = struct.Struct('<4sBBBB')
+# 3 ** 16 bytes por arreglo ya son unos 43 MB
+MAX_CASILLEROS = 16
+
+# Valores guardados para la ficha que mueve
+SIN_DATOS = 0
+DERROTA = 1
+EMPATE = 2
+VICTORIA = 3
+
+# Casillero guardado cuando la posicion no tiene movimientos
+SIN_JUGADA = 255
+
+def ruta_tablebase(filas: int, columnas: int, fichas_seguidas: int) -> str:
+    """Ruta de la tablebase para una configuracion de tablero, segun settings.IA_TABLEBASE."""
+    return archivo_mapeado.ruta_configuracion(IA_TABLEBASE, filas, columnas, fichas_seguidas)
+
+def decodificar(rango: int, casilleros: int) -> tuple[int, int]:
+    """Devuelve las mascaras de bits de la ficha 1 y de la ficha 2 de un rango."""
+    mascaras = [0, 0, 0]
+    for indice in range(casilleros):
+        rango, codigo = divmod(rango, 3)
+        mascaras[codigo] |= 1 << indice
+    return mascaras[1], mascaras[2]
+
+def resolver(filas: int, columnas: int, fichas_seguidas: int) -> tuple[bytearray, bytearray, bytearray]:
+    """Resuelve todas las posiciones alcanzables de una configuracion.
+
+    Returns:
+        tuple[bytearray, bytearray, bytearray]: Valor, distancia al final y mejor casillero
+        de cada rango. Las posiciones no alcanzables quedan con valor SIN_DATOS.
+    """
+    casilleros = filas * columnas
+    if casilleros > MAX_CASILLEROS:
+        raise ValueError(f'La tablebase admite tableros de hasta {MAX_CASILLEROS} casilleros.')
+
+    total = 3 ** casilleros
+    potencias = [3 ** indice for indice in range(casilleros)]
+    lleno = (1 << casilleros) - 1
+
+    valores = bytearray(total)
+    distancias = bytearray(total)
+    jugadas = bytearray([SIN_JUGADA]) * total
+
+    # Enumeracion hacia adelante, una capa por jugada. 'distancias' marca las ya vistas
+    # hasta que se resuelven.
+    capas = [array('Q', [0])]
+    distancias[0] = 1
+    for jugada in range(casilleros):
+        codigo = 1 + jugada % 2
+        siguiente = array('Q')
+        for rango in capas[-1]:
+            primera, segunda = decodificar(rango, casilleros)
+            ultima = segunda if codigo == 1 else primera
+            if jugada and tablero_bitboard.hay_linea(ultima, filas, columnas, fichas_seguidas):
+                continue
+
+            vacios = lleno & ~(primera | segunda)
+            while vacios:
+                bit = vacios & -vacios
+                vacios ^= bit
+                hijo = rango + codigo * potencias[bit.bit_length() - 1]
+                if not distancias[hijo]:
+                    distancias[hijo] = 1
+                    siguiente.append(hijo)
+        capas.append(siguiente)
+
+    # Resolucion desde la ultima capa hacia la primera
+    for jugada in range(len(capas) - 1, -1, -1):
+        codigo = 1 + jugada % 2
+        for rango in capas[jugada]:
+            primera, segunda = decodificar(rango, casilleros)
+            ultima = segunda if codigo == 1 else primera
+
+            if jugada and tablero_bitboard.hay_linea(ultima, filas, columnas, fichas_seguidas):
+                valores[rango], distancias[rango] = DERROTA, 0
+                continue
+
+            vacios = lleno & ~(primera | segunda)
+            if not vacios:
+                valores[rango], distancias[rango] = EMPATE, 0
+                continue
+
+            mejor = None
+            while vacios:
+                bit = vacios & -vacios
+                vacios ^= bit
+                indice = bit.bit_length() - 1
+                hijo = rango + codigo * potencias[indice]
+
+                # El valor del hijo es para el rival, se invierte
+                valor = VICTORIA + DERROTA - valores[hijo]
+                distancia = distancias[hijo] + 1
+                # Se gana lo antes posible y se pierde lo mas tarde posible
+                orden = (valor, -distancia if valor != DERROTA else distancia)
+                if mejor is None or orden > mejor[0]:
+                    mejor = (orden, valor, distancia, indice)
+
+            _, valores[rango], distancias[rango], jugadas[rango] = mejor
+
+    return valores, distancias, jugadas
+
+def guardar_tablebase(filas: int, columnas: int, fichas_seguidas: int, ruta: str):
+    """Resuelve una configuracion y guarda la tablebase en 'ruta'."""
+    valores, distancias, jugadas = resolver(filas, columnas, fichas_seguidas)
+
+    archivo_mapeado.preparar_directorio(ruta)
+    with open(ruta, 'wb') as archivo:
+        archivo.write(CABECERA.pack(MAGIA, VERSION, filas, columnas, fichas_seguidas))
+        archivo.write(valores)
+        archivo.write(distancias)
+        archivo.write(jugadas)
+
+    _tablebases.olvidar(filas, columnas, fichas_seguidas)
+
+class Tablebase(archivo_mapeado.ArchivoMapeado):
+    """Tablebase guardada en un archivo, mapeada en memoria en la primera consulta."""
+    MAGIA = MAGIA
+    VERSION = VERSION
+    CABECERA = CABECERA
+    NOMBRE = "la tablebase"
+
+    def largo_esperado(self, cabecera: tuple) -> int:
+        return CABECERA.size + 3 * 3 ** (cabecera[2] * cabecera[3])
+
+    def __total(self) -> int:
+        filas, columnas, _ = self.dimensiones()
+        return 3 ** (filas * columnas)
+
+    def valor(self, rango: int) -> int:
+        """Valor de la posicion para la ficha que mueve: SIN_DATOS, DERROTA, EMPATE o VICTORIA."""
+        return self.datos()[CABECERA.size + rango]
+
+    def distancia(self, rango: int) -> int:
+        """Jugadas hasta el final de la partida con juego perfecto."""
+        return self.datos()[CABECERA.size + self.__total() + rango]
+
+    def jugada(self, rango: int) -> int:
+        """Mejor casillero para la ficha que mueve, o SIN_JUGADA."""
+        return self.datos()[CABECERA.size + 2 * self.__total() + rango]
+
+# Tablebases abiertas por configuracion
+_tablebases = archivo_mapeado.ArchivosPorConfiguracion(IA_TABLEBASE, Tablebase)
+
+def tablebase_para(filas: int, columnas: int, fichas_seguidas: int):
+    """Devuelve la tablebase de una configuracion de tablero, o None si no fue construida."""
+    return _tablebases.obtener(filas, columnas, fichas_seguidas)
+
+def main(argumentos=None):
+    parser = argparse.ArgumentParser(description="Resuelve por completo un tablero chico y guarda su tablebase.")
+    parser.add_argument("--filas", type=int, default=TABLERO_FILAS)
+    parser.add_argument("--columnas", type=int, default=TABLERO_COLUMNAS)
+    parser.add_argument("--fichas-seguidas", type=int, default=FICHAS_SEGUIDAS_GANAR)
+    parser.add_argument("--salida", default=None, help="Archivo de salida (por defecto settings.IA_TABLEBASE).")
+    opciones = parser.parse_args(argumentos)
+
+    ruta = opciones.salida or ruta_tablebase(opciones.filas, opciones.columnas, opciones.fichas_seguidas)
+    guardar_tablebase(opciones.filas, opciones.columnas, opciones.fichas_seguidas, ruta)
+    print(f'Tablebase guardada en {ruta}')
+
+if __name__ == "__main__":
+    main()
@@ -82,6 +82,33 @@ class Tablero(ABC):
             y (int): Coordenada y
         """
 
+    @abstractmethod
+    def push(self, move: tuple[int, int], codigo: int):
+        """Coloca un elemento sin validar nada, para el ciclo de la busqueda. Se deshace con pop().
+
+        Args:
+            move (tuple[int, int]): Coordenadas (x, y) de un casillero vacio.
+            codigo (int): Codigo del elemento en este tablero.
+        """
+
+    @abstractmethod
+    def pop(self):
+        """Deshace el ultimo push."""
+
     @abstractmethod
     def check_patrones(self):
-        """Chequea por determinados patrones de elementos en la matriz."""
\ No newline at end of file
+        """Chequea por determinados patrones de elementos en la matriz."""
+
+    @abstractmethod
+    def check_ganador_desde(self, x: int, y: int, elemento, elementos_seguidos: int) -> bool:
+        """Chequea si el elemento en (x, y) forma parte de un patron, mirando solo las lineas que pasan por ese casillero.
+
+        Args:
+            x (int): Coordenada x del ultimo elemento insertado.
+            y (int): Coordenada y del ultimo elemento insertado.
+            elemento (any): El elemento a buscar.
+            elementos_seguidos (int): Cantidad de elementos seguidos que forman el patron.
+
+        Returns:
+            bool: Si se encontro el patron.
+        """
@@ -0,0 +1,317 @@
+"""Tablero de Ta-Te-Ti representado con una mascara de bits por ficha."""
+
+from functools import lru_cache
+from business.tablero import Tablero
+import business.tablero_tateti as tablero_tateti
+import business.jugador as jugador
+import business.transposicion as transposicion
+import business.simetrias as simetrias
+
+# Direcciones (dx, dy) en las que se puede formar una linea
+DIRECCIONES = ((1, 0), (0, 1), (1, 1), (-1, 1))
+
+@lru_cache(maxsize=None)
+def lineas_ganadoras(filas: int, columnas: int, fichas_seguidas: int) -> tuple[int, ...]:
+    """Mascaras de todas las lineas de 'fichas_seguidas' casilleros que entran en el tablero.
+
+    Returns:
+        tuple[int, ...]: Una mascara por linea, con el bit (y * columnas + x) por casillero.
+    """
+    lineas = []
+    for y in range(filas):
+        for x in range(columnas):
+            for dx, dy in DIRECCIONES:
+                fin_x = x + dx * (fichas_seguidas - 1)
+                fin_y = y + dy * (fichas_seguidas - 1)
+                if not (0 <= fin_x < columnas and fin_y < filas):
+                    continue
+
+                mascara = 0
+                for i in range(fichas_seguidas):
+                    mascara |= 1 << ((y + dy * i) * columnas + x + dx * i)
+                lineas.append(mascara)
+    return tuple(lineas)
+
+@lru_cache(maxsize=None)
+def lineas_por_casillero(filas: int, columnas: int, fichas_seguidas: int) -> tuple[tuple[int, ...], ...]:
+    """Para cada casillero, las mascaras de las lineas ganadoras que pasan por el."""
+    lineas = lineas_ganadoras(filas, columnas, fichas_seguidas)
+    return tuple(tuple(linea for linea in lineas if linea >> indice & 1) for indice in range(filas * columnas))
+
+@lru_cache(maxsize=None)
+def desplazamientos_ganadores(filas: int, columnas: int, fichas_seguidas: int) -> tuple[tuple[int, int], ...]:
+    """Por cada direccion, el desplazamiento de bits entre casilleros consecutivos y la
+    mascara de casilleros donde puede empezar una linea sin salirse del tablero.
+
+    Returns:
+        tuple[tuple[int, int], ...]: Pares (desplazamiento, mascara de inicios).
+    """
+    resultado = []
+    for dx, dy in DIRECCIONES:
+        inicios = 0
+        for y in range(filas):
+            for x in range(columnas):
+                fin_x = x + dx * (fichas_seguidas - 1)
+                fin_y = y + dy * (fichas_seguidas - 1)
+                if 0 <= fin_x < columnas and fin_y < filas:
+                    inicios |= 1 << (y * columnas + x)
+        if inicios:
+            resultado.append((dy * columnas + dx, inicios))
+    return tuple(resultado)
+
+def hay_linea(mascara: int, filas: int, columnas: int, fichas_seguidas: int) -> bool:
+    """Determina si una mascara contiene 'fichas_seguidas' bits alineados.
+
+    Se desplaza la mascara sobre si misma en cada direccion, asi que el costo depende
+    de 'fichas_seguidas' y no del tamaño del tablero.
+    """
+    for desplazamiento, inicios in desplazamientos_ganadores(filas, columnas, fichas_seguidas):
+        resto = mascara & inicios
+        for i in range(1, fichas_seguidas):
+            if not resto:
+                break
+            resto &= mascara >> (desplazamiento * i)
+        if resto:
+            return True
+    return False
+
+class TableroBitboard(Tablero):
+    """Tablero de Ta-Te-Ti que guarda un entero por ficha, con un bit por casillero ocupado.
+
+    Respeta la misma interfaz que TableroTateti, pero el chequeo de patrones se reduce a
+    unas pocas operaciones AND sobre enteros.
+    """
+
+    def __init__(self, filas: int, columnas: int) -> None:
+        if not isinstance(filas, int) or not isinstance(columnas, int):
+            raise TypeError("Las columnas y las filas deben ser numeros enteros.")
+
+        self.__filas = filas
+        self.__columnas = columnas
+        self.__lleno = (1 << (filas * columnas)) - 1
+        self.__permutaciones = simetrias.permutaciones(filas, columnas)
+        # Como en TableroTateti, cada ficha tiene un codigo que indexa estas listas
+        self.__fichas = [None]
+        self.__codigos = {}
+        self.__claves = [None]
+        self.__mascaras = [0]
+        self.__ocupado = 0
+        self.__hashes = []
+        # Indice y codigo de cada push, para deshacerlo con pop
+        self.__jugadas = []
+        self.__codigos_jugadas = []
+        self.construir_tablero()
+
+    @classmethod
+    def desde_tablero(clase, tablero: "Tablero") -> "TableroBitboard":
+        """Construye un tablero de bits con el mismo contenido que otro tablero."""
+        bitboard = clase(tablero.filas(), tablero.columnas())
+
+        # Un TableroTateti ya tiene sus casilleros codificados, no hace falta pasar por las fichas
+        if isinstance(tablero, tablero_tateti.TableroTateti):
+            fichas = tablero.fichas()
+            for indice, codigo in enumerate(tablero.celdas()):
+                if codigo:
+                    bitboard.__colocar(indice, bitboard.codigo(fichas[codigo]))
+            return bitboard
+
+        for y in range(1, tablero.filas() + 1):
+            for x in range(1, tablero.columnas() + 1):
+                elemento = tablero.elemento_coordenadas(x, y)
+                if elemento is not None:
+                    bitboard.insertar_elemento(x, y, elemento)
+        return bitboard
+
+    def serializar(self) -> tuple:
+        """Representacion compacta y barata de enviar a otro proceso: (filas, columnas, ((simbolo, mascara), ...))."""
+        return self.__filas, self.__columnas, tuple((self.__fichas[codigo].simbolo(), mascara)
+                                                    for codigo, mascara in enumerate(self.__mascaras) if mascara)
+
+    @classmethod
+    def deserializar(clase, datos: tuple) -> "TableroBitboard":
+        """Reconstruye un tablero a partir de 'serializar'."""
+        filas, columnas, mascaras = datos
+        tablero = clase(filas, columnas)
+        for simbolo, mascara in mascaras:
+            ficha = jugador.Ficha(simbolo)
+            while mascara:
+                bit = mascara & -mascara
+                mascara ^= bit
+                indice = bit.bit_length() - 1
+                tablero.insertar_elemento(indice % columnas + 1, indice // columnas + 1, ficha)
+        return tablero
+
+    def construir_tablero(self):
+        self.__mascaras = [0] * len(self.__fichas)
+        self.__ocupado = 0
+        # Un hash Zobrist por cada simetria del tablero, la primera es la identidad
+        self.__hashes = [0] * len(self.__permutaciones)
+        self.__jugadas = []
+        self.__codigos_jugadas = []
+
+    @property
+    def dimensiones(self):
+        return (self.__columnas + self.__filas) // 2
+
+    @property
+    def moves(self):
+        return tablero_tateti.movimientos_libres(self.__lleno & ~self.__ocupado, self.__columnas, self.__filas * self.__columnas)
+
+    def tablero(self):
+        return [[self.elemento_coordenadas(x, y) for x in range(1, self.__columnas + 1)]
+                for y in range(1, self.__filas + 1)]
+
+    def filas(self):
+        return self.__filas
+
+    def columnas(self):
+        return self.__columnas
+
+    def mascara(self, ficha: "jugador.Ficha") -> int:
+        """Mascara de bits de los casilleros ocupados por una ficha."""
+        codigo = self.__codigos.get(ficha)
+        return 0 if codigo is None else self.__mascaras[codigo]
+
+    def codigo(self, ficha: "jugador.Ficha") -> int:
+        """Codigo de una ficha en este tablero, se le asigna uno nuevo si no tenia."""
+        codigo = self.__codigos.get(ficha)
+        if codigo is None:
+            codigo = len(self.__fichas)
+            self.__fichas.append(ficha)
+            self.__codigos[ficha] = codigo
+            self.__claves.append(transposicion.claves_zobrist(ficha.simbolo(), self.__filas * self.__columnas))
+            self.__mascaras.append(0)
+        return codigo
+
+    def ocupado(self) -> int:
+        """Mascara de bits de todos los casilleros ocupados."""
+        return self.__ocupado
+
+    def hash_zobrist(self) -> int:
+        """Hash Zobrist de la posicion, actualizado con cada insercion y vaciado."""
+        return self.__hashes[0]
+
+    def hash_canonico(self) -> int:
+        """Hash Zobrist comun a todas las posiciones simetricas a esta."""
+        return min(self.__hashes)
+
+    def celdas(self, fichas: "list[jugador.Ficha]") -> list[int]:
+        """Codigo de cada casillero: 0 si esta vacio, o la posicion de su ficha en 'fichas' mas 1."""
+        celdas = [0] * (self.__filas * self.__columnas)
+        for codigo, ficha in enumerate(fichas, 1):
+            mascara = self.mascara(ficha)
+            while mascara:
+                bit = mascara & -mascara
+                celdas[bit.bit_length() - 1] = codigo
+                mascara ^= bit
+        return celdas
+
+    def __colocar(self, indice: int, codigo: int):
+        self.__mascaras[codigo] |= 1 << indice
+        self.__ocupado |= 1 << indice
+        self.__actualizar_hashes(codigo, indice)
+
+    def __actualizar_hashes(self, codigo: int, indice: int):
+        claves = self.__claves[codigo]
+        for simetria, permutacion in enumerate(self.__permutaciones):
+            self.__hashes[simetria] ^= claves[permutacion[indice]]
+
+    def __indice(self, x: int, y: int) -> int:
+        return (y - 1) * self.__columnas + (x - 1)
+
+    def __iter__(self):
+        for fila in self.tablero():
+            for casillero in fila:
+                yield casillero
+
+    def tablero_vacio(self) -> bool:
+        return self.__ocupado == 0
+
+    def tablero_lleno(self) -> bool:
+        return self.__ocupado == self.__lleno
+
+    def __eq__(self, tablero: "Tablero") -> bool:
+        if not isinstance(tablero, Tablero):
+            raise TypeError(f'No se puede comparar tablero de tateti con {type(tablero)}')
+
+        return self.tablero() == tablero.tablero()
+
+    def coordenadas_validas(self, x: int, y: int) -> bool:
+        return x > self.__columnas or x < 1 or y > self.__filas or y < 1
+
+    def insertar_elemento(self, x: int, y: int, elemento: "jugador.Ficha"):
+        if not isinstance(x, int) or not isinstance(y, int) or not isinstance(elemento, jugador.Ficha):
+            raise TypeError("Las coordenadas deben ser numeros y la ficha debe ser una ficha.")
+
+        if self.coordenadas_validas(x, y):
+            raise ValueError("Coordenadas fuera de rango")
+
+        indice = self.__indice(x, y)
+        if self.__ocupado >> indice & 1:
+            raise tablero_tateti.OcupadoError(f'Casillero ocupado ({x}, {y})')
+
+        self.__colocar(indice, self.codigo(elemento))
+
+    def vaciar_celda(self, x: int, y: int):
+        indice = self.__indice(x, y)
+        bit = 1 << indice
+        if not self.__ocupado & bit:
+            return
+
+        for codigo, mascara in enumerate(self.__mascaras):
+            if mascara & bit:
+                self.__mascaras[codigo] = mascara & ~bit
+                self.__actualizar_hashes(codigo, indice)
+                break
+        self.__ocupado &= ~bit
+
+    def push(self, move: tuple[int, int], codigo: int):
+        indice = (move[1] - 1) * self.__columnas + move[0] - 1
+        bit = 1 << indice
+        self.__mascaras[codigo] |= bit
+        self.__ocupado |= bit
+        self.__actualizar_hashes(codigo, indice)
+        self.__jugadas.append(indice)
+        self.__codigos_jugadas.append(codigo)
+
+    def pop(self):
+        indice = self.__jugadas.pop()
+        codigo = self.__codigos_jugadas.pop()
+        bit = 1 << indice
+        self.__mascaras[codigo] &= ~bit
+        self.__ocupado &= ~bit
+        self.__actualizar_hashes(codigo, indice)
+
+    def elemento_coordenadas(self, x: int, y: int):
+        if not isinstance(x, int) or not isinstance(y, int):
+            raise TypeError("Las coordenadas deben ser numeros y la ficha debe ser una ficha.")
+        if self.coordenadas_validas(x, y):
+            raise ValueError("Coordenadas fuera de rango.")
+
+        bit = 1 << self.__indice(x, y)
+        if self.__ocupado & bit:
+            for codigo, mascara in enumerate(self.__mascaras):
+                if mascara & bit:
+                    return self.__fichas[codigo]
+        return None
+
+    def check_patrones(self, ficha: "jugador.Ficha", fichas_seguidas: int) -> bool:
+        return hay_linea(self.mascara(ficha), self.__filas, self.__columnas, fichas_seguidas)
+
+    def check_ganador_desde(self, x: int, y: int, ficha: "jugador.Ficha", fichas_seguidas: int) -> bool:
+        mascara = self.mascara(ficha)
+        for linea in lineas_por_casillero(self.__filas, self.__columnas, fichas_seguidas)[self.__indice(x, y)]:
+            if mascara & linea == linea:
+                return True
+        return False
+
+    def clone(self):
+        """Creates a copy of the current board. The copy starts with no moves to pop()."""
+        cloned_tablero = TableroBitboard(self.__filas, self.__columnas)
+        cloned_tablero.__fichas = list(self.__fichas)
+        cloned_tablero.__codigos = dict(self.__codigos)
+        cloned_tablero.__claves = list(self.__claves)
+        cloned_tablero.__mascaras = list(self.__mascaras)
+        cloned_tablero.__ocupado = self.__ocupado
+        cloned_tablero.__hashes = list(self.__hashes)
+        return cloned_tablero
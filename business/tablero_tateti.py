@@ -1,11 +1,35 @@
 """Clases para el funcionamiento del tablero del Ta-Te-Ti"""
 
+from functools import lru_cache
 from business.tablero import Tablero
-import business.juego as juego
 import business.jugador as jugador
 
+@lru_cache(maxsize=None)
+def coordenadas_casilleros(columnas: int, casilleros: int) -> tuple[tuple[int, int], ...]:
+    """Coordenadas (x, y) de cada indice de casillero, en orden de filas."""
+    return tuple((indice % columnas + 1, indice // columnas + 1) for indice in range(casilleros))
+
+@lru_cache(maxsize=1 << 16)
+def movimientos_libres(vacios: int, columnas: int, casilleros: int) -> tuple[tuple[int, int], ...]:
+    """Movimientos disponibles de una mascara de casilleros vacios, en orden de filas.
+
+    El resultado se comparte entre todas las consultas con la misma mascara, asi que leer
+    los movimientos de una posicion ya vista no crea objetos nuevos.
+    """
+    coordenadas = coordenadas_casilleros(columnas, casilleros)
+    resultado = []
+    while vacios:
+        bit = vacios & -vacios
+        resultado.append(coordenadas[bit.bit_length() - 1])
+        vacios ^= bit
+    return tuple(resultado)
+
 class TableroTateti(Tablero):
-    """Tablero cuyo proposito es su uso en juegos de TaTeTi o variantes compatibles"""
+    """Tablero cuyo proposito es su uso en juegos de TaTeTi o variantes compatibles.
+
+    Internamente guarda un codigo chico por casillero (0 vacio, 1, 2, ... por ficha) en un
+    bytearray. Las fichas solo se usan al entrar y salir del tablero.
+    """
 
     def __init__(self, filas: int, columnas: int) -> None:
         if not isinstance(filas, int) or not isinstance(columnas, int):
@@ -13,19 +37,20 @@ class TableroTateti(Tablero):
 
         self.__filas = filas
         self.__columnas = columnas
-        self.__tablero = None
+        self.__celdas = bytearray()
+        # El codigo de cada ficha es su indice en esta lista, el 0 es el casillero vacio
+        self.__fichas = [None]
+        self.__codigos = {}
+        # Bit (y * columnas + x) encendido por cada casillero vacio
+        self.__vacios = 0
+        # Indices de los casilleros ocupados con push, en orden
+        self.__jugadas = []
         self.construir_tablero()
 
     def construir_tablero(self):
-        self.__tablero = []
-        
-        for i in range(self.__filas):
-            # Crea la fila
-            self.__tablero.append([])
-
-            for _ in range(self.__columnas):
-                # Crea las columnas de la fila
-                self.__tablero[i].append(None)
+        self.__vacios = (1 << (self.__filas * self.__columnas)) - 1
+        self.__celdas = bytearray(self.__filas * self.__columnas)
+        self.__jugadas = []
 
     @property
     def dimensiones(self):
@@ -33,15 +58,32 @@ class TableroTateti(Tablero):
 
     @property
     def moves(self):
-        available_moves = []
-        for row in range(1, self.__filas + 1):
-            for col in range(1, self.__columnas + 1):
-                if self.elemento_coordenadas(col, row) is None:
-                    available_moves.append((col, row))
-        return available_moves
+        return movimientos_libres(self.__vacios, self.__columnas, self.__filas * self.__columnas)
 
     def tablero(self):
-        return self.__tablero
+        """Matriz de fichas del tablero (None en los casilleros vacios), armada en cada llamada."""
+        fichas = self.__fichas
+        columnas = self.__columnas
+        return [[fichas[codigo] for codigo in self.__celdas[y * columnas:(y + 1) * columnas]] for y in range(self.__filas)]
+
+    def celdas(self) -> bytes:
+        """Codigo de cada casillero en orden de filas: 0 si esta vacio o el codigo de su ficha."""
+        return bytes(self.__celdas)
+
+    def fichas(self) -> list:
+        """Ficha de cada codigo, la posicion 0 (casillero vacio) es None."""
+        return list(self.__fichas)
+
+    def codigo(self, ficha: "jugador.Ficha") -> int:
+        """Codigo de una ficha en este tablero, se le asigna uno nuevo si no tenia."""
+        codigo = self.__codigos.get(ficha)
+        if codigo is None:
+            if len(self.__fichas) > 255:
+                raise ValueError("El tablero admite hasta 255 fichas distintas.")
+            codigo = len(self.__fichas)
+            self.__fichas.append(ficha)
+            self.__codigos[ficha] = codigo
+        return codigo
 
     def filas(self):
         return self.__filas
@@ -50,7 +92,12 @@ class TableroTateti(Tablero):
         return self.__columnas
 
     def set_tablero(self, tablero):
-        self.__tablero = tablero
+        self.construir_tablero()
+        for y, fila in enumerate(tablero):
+            for x, casillero in enumerate(fila):
+                if casillero is not None:
+                    self.__celdas[y * self.__columnas + x] = self.codigo(casillero)
+                    self.__vacios &= ~(1 << (y * self.__columnas + x))
 
     def set_filas(self, filas):
         if filas != 3:
@@ -65,27 +112,20 @@ class TableroTateti(Tablero):
         self.__columnas = columnas
 
     def __iter__(self):
-        for fila in self.__tablero:
-            for casillero in fila:
-                yield casillero
+        for codigo in self.__celdas:
+            yield self.__fichas[codigo]
 
     def tablero_vacio(self) -> bool:
-        for elemento in self:
-            if elemento is not None:
-                return False
-        return True
+        return self.__vacios == (1 << (self.__filas * self.__columnas)) - 1
 
     def tablero_lleno(self) -> bool:
-        for elemento in self:
-            if elemento is None:
-                return False
-        return True
+        return self.__vacios == 0
 
     def __eq__(self, tablero: "TableroTateti") -> bool:
         if not isinstance(tablero, TableroTateti):
             raise TypeError(f'No se puede comparar tablero de tateti con {type(tablero)}')
 
-        return self.__tablero == tablero.tablero()
+        return self.tablero() == tablero.tablero()
 
     def coordenadas_validas(self, x: int, y: int) -> bool:
         return x > self.__columnas or x < 1 or y > self.__filas or y < 1
@@ -97,13 +137,28 @@ class TableroTateti(Tablero):
         if self.coordenadas_validas(x, y):
             raise ValueError("Coordenadas fuera de rango")
 
-        if isinstance(self.__tablero[y-1][x-1], jugador.Ficha):
+        indice = (y-1) * self.__columnas + x-1
+        if self.__celdas[indice]:
             raise OcupadoError(f'Casillero ocupado ({x}, {y})')
 
-        self.__tablero[y-1][x-1] = elemento
+        self.__celdas[indice] = self.codigo(elemento)
+        self.__vacios &= ~(1 << indice)
 
     def vaciar_celda(self, x: int, y: int):
-        self.__tablero[y-1][x-1] = None
+        indice = (y-1) * self.__columnas + x-1
+        self.__celdas[indice] = 0
+        self.__vacios |= 1 << indice
+
+    def push(self, move: tuple[int, int], codigo: int):
+        indice = (move[1] - 1) * self.__columnas + move[0] - 1
+        self.__celdas[indice] = codigo
+        self.__vacios &= ~(1 << indice)
+        self.__jugadas.append(indice)
+
+    def pop(self):
+        indice = self.__jugadas.pop()
+        self.__celdas[indice] = 0
+        self.__vacios |= 1 << indice
 
     def elemento_coordenadas(self, x: int, y: int):
         if not isinstance(x, int) or not isinstance(y, int):
@@ -111,53 +166,83 @@ class TableroTateti(Tablero):
         if self.coordenadas_validas(x, y):
             raise ValueError("Coordenadas fuera de rango.")
 
-        return self.__tablero[y-1][x-1]
+        return self.__fichas[self.__celdas[(y-1) * self.__columnas + x-1]]
     
     def check_patrones(self, ficha: "jugador.Ficha", fichas_seguidas: int) -> bool:
+        # Una ficha que nunca se inserto no puede formar patrones
+        codigo = self.__codigos.get(ficha)
+        if codigo is None:
+            return False
+
         # Busca alguno de los patrones del tateti
-        if self.patron_filas(ficha, fichas_seguidas) or self.patron_columnas(ficha, fichas_seguidas) or self.patron_diagonales(ficha, fichas_seguidas):
+        if self.patron_filas(codigo, fichas_seguidas) or self.patron_columnas(codigo, fichas_seguidas) or self.patron_diagonales(codigo, fichas_seguidas):
             return True
 
         # Si no encuentra ningun patrón que cumpla con lo pedido
         return False
-    
-    def patron_filas(self, ficha, fichas_seguidas) -> bool:
-        """Busca por una determinada ficha en un patron horizontal"""
+
+    def check_ganador_desde(self, x: int, y: int, ficha: "jugador.Ficha", fichas_seguidas: int) -> bool:
+        codigo = self.__codigos.get(ficha)
+        if codigo is None:
+            return False
+
+        # Solo el ultimo elemento insertado puede completar un patron nuevo
+        for dx, dy in ((1, 0), (0, 1), (1, 1), (1, -1)):
+            seguidas = 1
+            for sentido in (1, -1):
+                actual_x, actual_y = x + dx * sentido, y + dy * sentido
+                while (1 <= actual_x <= self.__columnas and 1 <= actual_y <= self.__filas
+                       and self.__celdas[(actual_y-1) * self.__columnas + actual_x-1] == codigo):
+                    seguidas += 1
+                    actual_x += dx * sentido
+                    actual_y += dy * sentido
+            if seguidas >= fichas_seguidas:
+                return True
+        return False
+
+    def patron_filas(self, codigo, fichas_seguidas) -> bool:
+        """Busca por el codigo de una ficha en un patron horizontal"""
+        celdas = self.__celdas
+        columnas = self.__columnas
 
         # Horizontales
         for y in range(self.__filas):
             for x in range(self.__columnas - fichas_seguidas + 1):
                 encontrado = True
                 for i in range(fichas_seguidas):
-                    if self.elemento_coordenadas(x + i + 1, y + 1) != ficha:
+                    if celdas[y * columnas + x + i] != codigo:
                         encontrado = False
                         break
                 if encontrado:
                     return True
 
-    def patron_columnas(self, ficha, fichas_seguidas) -> bool:
-        """Busca por una determinada ficha en un patron vertical"""
+    def patron_columnas(self, codigo, fichas_seguidas) -> bool:
+        """Busca por el codigo de una ficha en un patron vertical"""
+        celdas = self.__celdas
+        columnas = self.__columnas
 
         # Verticales
         for x in range(self.__columnas):
             for y in range(self.__filas - fichas_seguidas + 1):
                 encontrado = True
                 for i in range(fichas_seguidas):
-                    if self.elemento_coordenadas(x + 1, y + i + 1) != ficha:
+                    if celdas[(y + i) * columnas + x] != codigo:
                         encontrado = False
                         break
                 if encontrado:
                     return True
                 
-    def patron_diagonales(self, ficha, fichas_seguidas) -> bool:
-        """Busca por una determinada ficha en un patron diagonal"""
+    def patron_diagonales(self, codigo, fichas_seguidas) -> bool:
+        """Busca por el codigo de una ficha en un patron diagonal"""
+        celdas = self.__celdas
+        columnas = self.__columnas
 
         # Izquierda - Derecha
         for y in range(self.__filas - fichas_seguidas + 1):
             for x in range(self.__columnas - fichas_seguidas + 1):
                 encontrado = True
                 for i in range(fichas_seguidas):
-                    if self.elemento_coordenadas(x + i + 1, y + i + 1) != ficha:
+                    if celdas[(y + i) * columnas + x + i] != codigo:
                         encontrado = False
                         break
                 if encontrado:
@@ -168,16 +253,19 @@ class TableroTateti(Tablero):
             for x in range(self.__columnas - fichas_seguidas + 1):
                 encontrado = True
                 for i in range(fichas_seguidas):
-                    if self.elemento_coordenadas(x + i + 1, y - i + 1) != ficha:
+                    if celdas[(y - i) * columnas + x + i] != codigo:
                         encontrado = False
                         break
                 if encontrado:
                     return True
 
     def clone(self):
-        """Creates a copy of the current board"""
+        """Creates a copy of the current board. The copy starts with no moves to pop()."""
         cloned_tablero = TableroTateti(self.__filas, self.__columnas)
-        cloned_tablero.set_tablero([row[:] for row in self.__tablero])
+        cloned_tablero.__celdas = bytearray(self.__celdas)
+        cloned_tablero.__fichas = list(self.__fichas)
+        cloned_tablero.__codigos = dict(self.__codigos)
+        cloned_tablero.__vacios = self.__vacios
         return cloned_tablero
 
 class OcupadoError(Exception):
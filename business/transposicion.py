@@ -0,0 +1,79 @@
+"""Tabla de transposicion y claves Zobrist para la busqueda de la IA."""
+
+from collections import OrderedDict
+from functools import lru_cache
+import random
+
+# Tipos de valor guardados en la tabla
+EXACTO = 0
+COTA_INFERIOR = 1
+COTA_SUPERIOR = 2
+
+# Clave que se combina con el hash cuando le toca mover al jugador que maximiza
+CLAVE_MAXIMIZA = random.Random("tateti/turno").getrandbits(64)
+
+@lru_cache(maxsize=None)
+def claves_zobrist(simbolo: str, casilleros: int) -> tuple[int, ...]:
+    """Claves aleatorias de 64 bits de una ficha para cada casillero del tablero.
+
+    Se generan a partir del simbolo, asi que son las mismas en todos los procesos.
+
+    Args:
+        simbolo (str): El simbolo de la ficha.
+        casilleros (int): La cantidad de casilleros del tablero.
+
+    Returns:
+        tuple[int, ...]: Una clave por casillero.
+    """
+    generador = random.Random(f'tateti/{simbolo}/{casilleros}')
+    return tuple(generador.getrandbits(64) for _ in range(casilleros))
+
+class TablaTransposicion():
+    """Guarda el resultado de posiciones ya buscadas, con un limite de entradas.
+
+    Cada entrada es (valor, profundidad restante, tipo). Cuando se llena se descarta la
+    entrada usada hace mas tiempo, y una entrada nunca se pisa con una de menor profundidad.
+    """
+
+    def __init__(self, max_entradas: int):
+        if not isinstance(max_entradas, int) or max_entradas < 1:
+            raise ValueError("La tabla debe admitir al menos una entrada.")
+
+        self.__entradas = OrderedDict()
+        self.__max_entradas = max_entradas
+
+    def __len__(self):
+        return len(self.__entradas)
+
+    def max_entradas(self):
+        return self.__max_entradas
+
+    def buscar(self, clave: int):
+        """Devuelve la entrada guardada para una clave, o None si no existe."""
+        entrada = self.__entradas.get(clave)
+        if entrada is not None:
+            self.__entradas.move_to_end(clave)
+        return entrada
+
+    def guardar(self, clave: int, valor: float, profundidad: float, tipo: int):
+        """Guarda el resultado de una posicion.
+
+        Args:
+            clave (int): Hash de la posicion.
+            valor (float): Valor encontrado.
+            profundidad (float): Profundidad restante con la que se busco.
+            tipo (int): EXACTO, COTA_INFERIOR o COTA_SUPERIOR.
+        """
+        anterior = self.__entradas.get(clave)
+        if anterior is not None and anterior[1] > profundidad:
+            self.__entradas.move_to_end(clave)
+            return
+
+        self.__entradas[clave] = (valor, profundidad, tipo)
+        self.__entradas.move_to_end(clave)
+
+        if len(self.__entradas) > self.__max_entradas:
+            self.__entradas.popitem(last=False)
+
+    def limpiar(self):
+        self.__entradas.clear()
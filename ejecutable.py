@@ -1,4 +1,8 @@
 """Archivo que ejecuta el juego de TaTeTi, usado para tests manuales."""
+import argparse
 from business.juego import Tateti
+from presentation.terminal_UI import PAUSAS
 
-Tateti.iniciar()
\ No newline at end of file
+parser = argparse.ArgumentParser(description="Juego de Ta-Te-Ti Player VS AI en la terminal.")
+parser.add_argument("--ritmo", choices=list(PAUSAS), default=None, help="Por defecto UI_RITMO de settings.py.")
+Tateti.iniciar(parser.parse_args().ritmo)
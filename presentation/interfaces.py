@@ -23,6 +23,10 @@ class IJuegoUI(ABC):
     def mostrar_turno_jugador(self, jugador):
         """Muestra quien debe poner su ficha y la ficha que debe poner."""
 
+    @abstractmethod
+    def mostrar_pensando(self, jugador, cuadro: int):
+        """Muestra que un jugador esta pensando su movimiento, se llama varias veces por segundo con 'cuadro' creciente."""
+
     @abstractmethod
     def mensaje_ganador(self):
         """Muestra el mensaje del ganador."""
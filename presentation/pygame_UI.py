@@ -61,11 +61,17 @@ class TatetiPYGAME_UI(IJuegoUI):
             print(f'{self.__tateti.jugadores()[i].nombre()} ({i+1})')
 
     def mostrar_tablero(self):
+        # Cada movimiento deja un tablero nuevo en la partida
+        self.__tableroUI = TableroTatetiTerminalUI(self.__tateti.tablero())
         self.__tableroUI.mostrar_tablero()
 
     def mostrar_turno_jugador(self, jugador):
         print(f'Turno de {jugador.nombre()} // Ficha: {str(jugador.ficha())}')
 
+    def mostrar_pensando(self, jugador, cuadro: int):
+        # Atender los eventos evita que la ventana quede "sin responder" mientras la IA busca
+        pygame.event.pump()
+
     def mensaje_ganador(self):
         """Mensaje que se muestra al ganar la partida"""
         self.mostrar_tablero()
@@ -90,6 +96,7 @@ class TableroTatetiTerminalUI(TableroUI):
             techo += str(top+1) + " "
         print(techo)
 
+        matriz = self.__tablero.tablero()
         for y in range(self.__tablero.filas()):
             if len(str(y+1)) != 1:
                 linea = str(y+1) + " "
@@ -97,10 +104,10 @@ class TableroTatetiTerminalUI(TableroUI):
                 linea = str(y+1) + "  "
                 
             for x in range(self.__tablero.columnas()):
-                if self.__tablero.tablero()[y][x] is None:
+                if matriz[y][x] is None:
                     valor = " "
                 else:
-                    valor = str(self.__tablero.tablero()[y][x])
+                    valor = str(matriz[y][x])
                 if x+1 > 9:
                     valor += " "
                 linea += f'|{valor}'
@@ -1,33 +1,95 @@
 """Controladores de terminal para el juego TaTeTi."""
 
+import os
 import platform
-from os import system
+import shutil
+import sys
 from time import sleep
 import business.juego as juego
 import business.tablero_tateti as tablero_tateti
 from presentation.interfaces import IJuegoUI, TableroUI
 
+# Cuadros de la animacion de espera
+CUADROS_ESPERA = "|/-\\"
+
+# Ritmos de la interfaz, ver UI_RITMO en settings.py
+RITMO_INTERACTIVO = "interactivo"
+RITMO_RAPIDO = "rapido"
+RITMO_HEADLESS = "headless"
+# Segundos de pausa de cada ritmo: (pantalla de bienvenida, fin de partida)
+PAUSAS = {RITMO_INTERACTIVO: (3, 2), RITMO_RAPIDO: (0, 0), RITMO_HEADLESS: (0, 0)}
+
+# Secuencias ANSI
+LIMPIAR_PANTALLA = "\x1b[H\x1b[2J"
+LIMPIAR_HASTA_EL_FINAL = "\x1b[J"
+LIMPIAR_LINEA = "\x1b[2K"
+# Lineas que se dejan libres debajo del tablero para el turno, el error y las entradas
+LINEAS_DEBAJO_DEL_TABLERO = 5
+
+def mover_cursor(fila: int, columna: int) -> str:
+    """Secuencia ANSI que lleva el cursor a (fila, columna), contando desde 1."""
+    return f'\x1b[{fila};{columna}H'
+
 class TaTeTiTerminalUI(IJuegoUI):
-    """Controlador de UI en la terminal del juego TaTeTi."""
+    """Controlador de UI en la terminal del juego TaTeTi.
+
+    En una terminal la pantalla se borra con secuencias ANSI y solo cuando hace falta: si el
+    tablero ya esta dibujado se reescriben los casilleros que cambiaron. Si la salida no es
+    una terminal (por ejemplo un archivo) o el ritmo es headless, se escribe todo de corrido,
+    sin borrar.
+    """
 
-    def __init__(self, tateti: "juego.Tateti"):
+    def __init__(self, tateti: "juego.Tateti", ritmo: str = RITMO_INTERACTIVO):
         if not isinstance(tateti, juego.Tateti):
             raise TypeError("Se debe pasar una instancia de juego por parametro.")
+        if ritmo not in PAUSAS:
+            raise ValueError(f'Ritmo desconocido ({ritmo}), opciones: {", ".join(PAUSAS)}')
 
         self.__tateti = tateti
         self.__tableroUI = TableroTatetiTerminalUI(self.__tateti.tablero())
-        
+        self.__ritmo = ritmo
+        self.__pausa_bienvenida, self.__pausa_fin = PAUSAS[ritmo]
+        self.__ansi = ritmo != RITMO_HEADLESS and sys.stdout.isatty() and os.environ.get("TERM") != "dumb"
+        # cls() solo lo anota, la pantalla se borra con lo proximo que se escribe
+        self.__limpiar = False
+
+        if self.__ansi and platform.system() == "Windows":
+            # Activa las secuencias ANSI en la consola de Windows
+            os.system("")
+
+    def __escribir(self, texto: str, tablero: bool = False):
+        """Escribe de una vez, borrando antes la pantalla si hay un cls() pendiente.
+
+        Args:
+            tablero (bool): Si 'texto' es el tablero completo, que queda dibujado arriba de la pantalla.
+        """
+        if self.__limpiar:
+            texto = LIMPIAR_PANTALLA + texto
+            self.__limpiar = False
+            if not tablero:
+                self.__tableroUI.olvidar()
+        sys.stdout.write(texto)
+        sys.stdout.flush()
+
+    def ritmo(self):
+        return self.__ritmo
+
+    def __pausa(self, segundos: float):
+        """Espera para que se lea lo que hay en pantalla, si el ritmo lo pide."""
+        if segundos > 0:
+            sleep(segundos)
+
     def cls(self):
         """Limpia la terminal en Windows, Linux y macOS."""
-        if platform.system() == "Windows":
-            system('cls')
-        else:
-            system('clear')
+        if self.__ansi:
+            self.__limpiar = True
 
     def pantalla_bienvenida(self):
+        if self.__ritmo == RITMO_HEADLESS:
+            return
         self.cls()
-        print("\n\t\t\tTa-Te-Ti\n\t\t      Player VS AI")
-        sleep(3)
+        self.__escribir("\n\t\t\tTa-Te-Ti\n\t\t      Player VS AI\n")
+        self.__pausa(self.__pausa_bienvenida)
 
     def mostrar_error(self, mensaje: str):
         """Usado para mostrar mensajes de error
@@ -35,65 +97,131 @@ class TaTeTiTerminalUI(IJuegoUI):
         Args:
             mensaje (str): El mensaje
         """
-        print(mensaje)
+        self.__escribir(f'{mensaje}\n')
 
     def mostrar_opciones_menu_principal(self):
-        print("Ta-Te-Ti")
-        for i in range(len(self.__tateti.opciones_menu_principal())):
-            print(f'{i+1} - {self.__tateti.opciones_menu_principal()[i][0]}')
+        opciones = self.__tateti.opciones_menu_principal()
+        self.__escribir("Ta-Te-Ti\n" + "".join(f'{i+1} - {opciones[i][0]}\n' for i in range(len(opciones))))
 
     def mostrar_opciones_eleccion_jugador_inicial(self):
-        print("Eleccion de jugador inicial")
-        for i in range(len(self.__tateti.jugadores())):
-            print(f'{self.__tateti.jugadores()[i].nombre()} ({i+1})')
+        jugadores = self.__tateti.jugadores()
+        self.__escribir("Eleccion de jugador inicial\n" + "".join(f'{jugadores[i].nombre()} ({i+1})\n' for i in range(len(jugadores))))
 
     def mostrar_tablero(self):
-        self.__tableroUI.mostrar_tablero()
+        self.__tableroUI.set_tablero(self.__tateti.tablero())
+
+        if not self.__ansi:
+            self.__tableroUI.mostrar_tablero()
+            return
+
+        if not self.__limpiar:
+            # Se dibuja donde esta el cursor, asi que despues no se puede actualizar
+            self.__escribir(self.__tableroUI.texto())
+            self.__tableroUI.olvidar()
+        elif self.__tableroUI.dibujado() and shutil.get_terminal_size().lines >= self.__tableroUI.alto() + LINEAS_DEBAJO_DEL_TABLERO:
+            # El tablero sigue arriba de la pantalla: se reescriben los casilleros que cambiaron y se borra lo de abajo
+            self.__limpiar = False
+            self.__escribir(self.__tableroUI.cambios() + mover_cursor(self.__tableroUI.alto() + 1, 1) + LIMPIAR_HASTA_EL_FINAL)
+        else:
+            self.__escribir(self.__tableroUI.texto(), tablero=True)
 
     def mostrar_turno_jugador(self, jugador):
-        print(f'Turno de {jugador.nombre()} // Ficha: {str(jugador.ficha())}')
+        self.__escribir(f'Turno de {jugador.nombre()} // Ficha: {str(jugador.ficha())}\n')
+
+    def mostrar_pensando(self, jugador, cuadro: int):
+        if self.__ritmo == RITMO_HEADLESS:
+            return
+        self.__escribir(f'\r{jugador.nombre()} está pensando {CUADROS_ESPERA[cuadro % len(CUADROS_ESPERA)]}')
 
     def mensaje_ganador(self):
         """Mensaje que se muestra al ganar la partida"""
         self.cls()
         self.mostrar_tablero()
-        print(f'Ganó {self.__tateti.jugador_actual().nombre()}')
-        sleep(2)
+        self.__escribir(f'Ganó {self.__tateti.jugador_actual().nombre()}\n')
+        self.__pausa(self.__pausa_fin)
 
     def mensaje_empate(self):
         """Mensaje que se muestra al empatar la partida"""
         self.cls()
         self.mostrar_tablero()
-        print("Empate")
-        sleep(2)
+        self.__escribir("Empate\n")
+        self.__pausa(self.__pausa_fin)
 
 class TableroTatetiTerminalUI(TableroUI):
-    """Clase que maneja como se muestra el tablero en la terminal."""
+    """Clase que maneja como se muestra el tablero en la terminal.
+
+    Recuerda lo ultimo que dibujo arriba de la pantalla, para poder actualizarlo con cambios().
+    """
     def __init__(self, tablero: "tablero_tateti.TableroTateti") -> None:
+        self.__dibujado: list[list[str]] = None
+        self.set_tablero(tablero)
+
+    def set_tablero(self, tablero: "tablero_tateti.TableroTateti"):
         if not isinstance(tablero, tablero_tateti.TableroTateti):
             raise TypeError("El tablero debe ser un tablero de tateti.")
 
         self.__tablero = tablero
 
-    def mostrar_tablero(self):
-        techo = "    "
-        for top in range(self.__tablero.columnas()):
-            techo += str(top+1) + " "
-        print(techo)
-
-        for y in range(self.__tablero.filas()):
-            if len(str(y+1)) != 1:
-                linea = str(y+1) + " "
-            else:
-                linea = str(y+1) + "  "
-                
-            for x in range(self.__tablero.columnas()):
-                if self.__tablero.tablero()[y][x] is None:
-                    valor = " "
-                else:
-                    valor = str(self.__tablero.tablero()[y][x])
+    def alto(self) -> int:
+        """Lineas que ocupa el tablero."""
+        return self.__tablero.filas() + 1
+
+    def dibujado(self) -> bool:
+        """Si hay un tablero de las mismas dimensiones dibujado arriba de la pantalla."""
+        return (self.__dibujado is not None and len(self.__dibujado) == self.__tablero.filas()
+                and len(self.__dibujado[0]) == self.__tablero.columnas())
+
+    def olvidar(self):
+        """Se llama cuando el tablero dibujado deja de estar en pantalla."""
+        self.__dibujado = None
+
+    def __valores(self) -> list[list[str]]:
+        """Texto de cada casillero."""
+        valores = []
+        for fila in self.__tablero.tablero():
+            linea = []
+            for x, casillero in enumerate(fila):
+                valor = " " if casillero is None else str(casillero)
                 if x+1 > 9:
                     valor += " "
-                linea += f'|{valor}'
-            linea += "|"
-            print(linea)
+                linea.append(valor)
+            valores.append(linea)
+        return valores
+
+    def __linea(self, y: int, valores: list[str]) -> str:
+        etiqueta = str(y+1) + " " if len(str(y+1)) != 1 else str(y+1) + "  "
+        return etiqueta + "".join(f'|{valor}' for valor in valores) + "|"
+
+    def texto(self) -> str:
+        """El tablero completo, que queda como dibujado."""
+        self.__dibujado = self.__valores()
+        techo = "    " + "".join(f'{top+1} ' for top in range(self.__tablero.columnas()))
+        return "\n".join([techo] + [self.__linea(y, valores) for y, valores in enumerate(self.__dibujado)]) + "\n"
+
+    def cambios(self) -> str:
+        """Secuencias ANSI que llevan el tablero dibujado al actual, reescribiendo solo los casilleros que cambiaron."""
+        valores = self.__valores()
+        salida = []
+        for y, (anteriores, actuales) in enumerate(zip(self.__dibujado, valores)):
+            if anteriores == actuales:
+                continue
+
+            # La primera linea de la pantalla es el techo con los numeros de columna
+            if [len(valor) for valor in anteriores] != [len(valor) for valor in actuales]:
+                # Si cambia el ancho de algun casillero se corre el resto de la linea
+                salida.append(mover_cursor(y + 2, 1) + LIMPIAR_LINEA + self.__linea(y, actuales))
+                continue
+
+            # La etiqueta de la fila ocupa 3 columnas y cada casillero empieza con '|'
+            columna = 4
+            for anterior, actual in zip(anteriores, actuales):
+                if anterior != actual:
+                    salida.append(mover_cursor(y + 2, columna + 1) + actual)
+                columna += 1 + len(actual)
+
+        self.__dibujado = valores
+        return "".join(salida)
+
+    def mostrar_tablero(self):
+        sys.stdout.write(self.texto())
+        sys.stdout.flush()
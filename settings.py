@@ -15,3 +15,41 @@ CANT_JUGADORES = 3
 
 # Nombre predeterminado para el jugador humano
 NOMBRE_JUGADOR_HUMANO = "Player"
+
+# Cantidad maxima de posiciones que la IA recuerda durante una partida
+IA_MAX_ENTRADAS_TRANSPOSICION = 200_000
+
+# Libro de aperturas de la IA (se ignora si el archivo no existe)
+IA_LIBRO_APERTURAS = "libros/apertura_{filas}x{columnas}_{fichas_seguidas}.bin"
+
+# Tablebase de la IA Tablebase_AI (ver business/solucionador.py)
+IA_TABLEBASE = "libros/tablebase_{filas}x{columnas}_{fichas_seguidas}.bin"
+
+# Tiempo maximo (en segundos) que la IA busca cada movimiento, None usa una profundidad fija
+IA_TIEMPO_POR_MOVIMIENTO = 2.0
+
+# Tiempo maximo (en segundos) que la IA piensa durante el turno del rival, None no piensa
+IA_TIEMPO_PONDERACION = 30.0
+
+# Procesos en los que la IA reparte su busqueda (1 busca en el proceso del juego, 0 usa todos los nucleos)
+IA_PROCESOS = 1
+
+# Si la IA busca en segundo plano mientras la interfaz muestra que esta pensando
+JUEGO_ASINCRONICO = True
+
+# Ritmo de la interfaz de terminal: "interactivo" hace pausas para leer los mensajes, "rapido" no,
+# y "headless" tampoco anima ni borra la pantalla y lee las entradas de la entrada estandar de una vez
+UI_RITMO = "interactivo"
+
+# Servidor de partidas (ver business/servidor.py)
+SERVIDOR_HOST = "127.0.0.1"
+SERVIDOR_PUERTO = 8765
+# Procesos que buscan los movimientos de la IA para todas las sesiones
+SERVIDOR_PROCESOS = 2
+SERVIDOR_MAX_SESIONES = 1000
+# Busquedas de la IA en curso o en espera; si se llena, los pedidos se rechazan
+SERVIDOR_MAX_BUSQUEDAS = 32
+# Segundos sin pedidos tras los que se descarta una sesion o se cierra una conexion
+SERVIDOR_TIMEOUT_SESION = 600
+# Movimientos de la IA recordados por posicion
+SERVIDOR_MAX_CACHE = 100_000